@@ -1,5 +1,5 @@
 import sqlite3
-import json
+import ijson
 
 # Путь к вашей базе данных
 DB_PATH = "sqlite copy.db"
@@ -7,10 +7,16 @@ DB_PATH = "sqlite copy.db"
 # Путь к вашему JSON-файлу
 JSON_PATH = "waitlist.json"
 
-# Подключение к базе данных
-conn = sqlite3.connect(DB_PATH)
+# Подключение к базе данных; транзакциями управляем сами
+conn = sqlite3.connect(DB_PATH, isolation_level=None)
 cursor = conn.cursor()
 
+# Разовый импорт: отключаем журнал и fsync, держим временные данные и кэш в памяти
+conn.execute("PRAGMA journal_mode=OFF")
+conn.execute("PRAGMA synchronous=OFF")
+conn.execute("PRAGMA temp_store=MEMORY")
+conn.execute("PRAGMA cache_size=-65536")
+
 # Убедитесь, что таблица существует
 cursor.execute("""
 CREATE TABLE IF NOT EXISTS users (
@@ -26,32 +32,35 @@ CREATE TABLE IF NOT EXISTS users (
 );
 """)
 
-# Чтение данных из JSON
-with open(JSON_PATH, "r") as file:
-    data = json.load(file)
-
-# Перенос данных в базу
-for user in data:
-    cursor.execute("""
+# Потоковое чтение JSON и перенос данных в базу одной транзакцией
+conn.execute("BEGIN IMMEDIATE")
+with open(JSON_PATH, "rb") as file:
+    cursor.executemany("""
     INSERT OR IGNORE INTO users (
         user_id, email, ozon_api_key, wildberries_api_key, 
         subscription_status, subscription_end_date, created_at, 
         check_interval, ozon_client_id
     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
-        user["user_id"],
-        user["email"],
-        user["ozon_api_key"],
-        user["wildberries_api_key"],
-        user["subscription_status"],
-        user["subscription_end_date"],
-        user["created_at"],
-        user["check_interval"],
-        user["ozon_client_id"]
+        (
+            user["user_id"],
+            user["email"],
+            user["ozon_api_key"],
+            user["wildberries_api_key"],
+            user["subscription_status"],
+            user["subscription_end_date"],
+            user["created_at"],
+            user["check_interval"],
+            user["ozon_client_id"]
+        )
+        for user in ijson.items(file, "item")
     ))
 
 # Сохранение изменений и закрытие подключения
-conn.commit()
+conn.execute("COMMIT")
+
+# Обновляем статистику планировщика после массовой загрузки
+conn.execute("ANALYZE users")
 conn.close()
 
 print("Данные успешно импортированы!")
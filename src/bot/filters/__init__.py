@@ -0,0 +1,8 @@
+"""
+Filters for the PriceGuard bot.
+File: src/bot/filters/__init__.py
+"""
+
+from .admin import DENY_ALERT, DENY_MSG, IsAdminFilter, is_admin
+
+__all__ = ['DENY_ALERT', 'DENY_MSG', 'IsAdminFilter', 'is_admin']
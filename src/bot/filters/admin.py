@@ -0,0 +1,28 @@
+"""
+Admin filter for the PriceGuard bot.
+File: src/bot/filters/admin.py
+"""
+
+from typing import FrozenSet
+
+from aiogram.filters import BaseFilter
+from aiogram.types import Message, CallbackQuery
+
+from core.config import ADMIN_USER_ID
+
+# Admin IDs are resolved once from config; membership is an O(1) int lookup
+_ADMIN_IDS: FrozenSet[int] = frozenset({ADMIN_USER_ID})
+
+# Reply for non-admins, shared by the admin fallbacks
+DENY_MSG = "❌ У вас нет прав администратора"
+DENY_ALERT = DENY_MSG
+
+def is_admin(user_id: int) -> bool:
+    """Check if user is admin."""
+    return user_id in _ADMIN_IDS
+
+class IsAdminFilter(BaseFilter):
+    """Pass only updates sent by the bot admin."""
+
+    async def __call__(self, event: Message | CallbackQuery) -> bool:
+        return event.from_user is not None and event.from_user.id in _ADMIN_IDS
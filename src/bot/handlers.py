@@ -1,10 +0,0 @@
-"""
-Message handlers for the PriceGuard bot.
-"""
-
-from aiogram import Dispatcher
-
-def register_all_handlers(dp: Dispatcher):
-    """Register all message handlers."""
-    # All handlers are now in routers
-    pass
@@ -3,8 +3,11 @@ Admin command handlers for the PriceGuard bot.
 File: src/bot/handlers/admin.py
 """
 
+import asyncio
+import os
+import re
 from datetime import datetime
-from typing import List
+from typing import List, Union
 
 from aiogram import Router, F, types
 from aiogram.filters import Command, StateFilter
@@ -13,33 +16,43 @@ from aiogram.fsm.state import State, StatesGroup
 
 from core.config import Settings
 from core.database import Database
+from core.logging import get_logger
+from bot.filters import DENY_ALERT, DENY_MSG, IsAdminFilter
 from bot.keyboards.admin import (
     get_admin_keyboard,
-    get_users_keyboard,
     get_subscriptions_keyboard,
+    get_subscriptions_pagination_keyboard,
     get_users_pagination_keyboard
 )
-from bot.utils.messages import format_user_info, format_subscription_info
+from bot.utils.edit import edit_text_if_changed
+from bot.utils.messages import format_users_list, format_subscriptions_list
+from services.marketplaces.queue import RateLimiter
 from services.monitoring.monitor import PromotionMonitor  # noqa: F401
 
 router = Router()
+logger = get_logger(__name__)
+# Non-admin updates are rejected by the dispatcher before any handler runs
+router.message.filter(IsAdminFilter())
+router.callback_query.filter(IsAdminFilter())
+
+# Fallback for admin commands and buttons used by non-admins
+denied_router = Router(name="admin_denied")
+
+# Broadcast limits
+BROADCAST_CONCURRENCY = 25
+BROADCAST_RATE_PER_SECOND = 25
+
+# Size of the log tail sent by /logs
+LOG_TAIL_BYTES = 4000
 
 class AdminStates(StatesGroup):
     """Admin FSM states."""
     waiting_for_broadcast = State()
     waiting_for_force_check = State()
 
-async def is_admin(user_id: int, settings: Settings) -> bool:
-    """Check if user is admin."""
-    return str(user_id) == str(settings.telegram.admin_user_id)
-
 @router.message(Command("admin"))
 async def cmd_admin(message: types.Message, settings: Settings):
     """Admin menu handler."""
-    if not await is_admin(message.from_user.id, settings):
-        await message.answer("❌ У вас нет прав администратора")
-        return
-
     await message.answer(
         "👨‍💼 Панель администратора",
         reply_markup=get_admin_keyboard()
@@ -48,49 +61,42 @@ async def cmd_admin(message: types.Message, settings: Settings):
 @router.callback_query(F.data == "admin_users")
 async def on_admin_users(callback: types.CallbackQuery, db: Database, settings: Settings):
     """Handle admin_users callback."""
-    if not await is_admin(callback.from_user.id, settings):
-        await callback.answer("❌ У вас нет прав администратора", show_alert=True)
-        return
-
     users_data = await db.get_all_users(page=1)
-    users = users_data["users"]
     
-    message = "👥 Список пользователей:\n\n"
-    message += "\n\n".join([format_user_info(user) for user in users])
-    message += f"\n\nВсего пользователей: {users_data['total_users']}"
+    message = format_users_list(users_data)
     
     keyboard = get_users_pagination_keyboard(
         current_page=users_data["current_page"],
         total_pages=users_data["total_pages"]
     )
     
-    try:
-        await callback.message.edit_text(
-            text=message,
-            reply_markup=keyboard,
-            parse_mode="Markdown"
-        )
-    except Exception as e:
-        logger = get_logger(__name__)
-        logger.error(f"Error in on_admin_users: {str(e)}\nMessage: {message}")
-        await callback.message.edit_text(
-            "❌ Произошла ошибка при форматировании сообщения",
-            reply_markup=keyboard
-        )
+    async def edit_message():
+        try:
+            await edit_text_if_changed(
+                callback.message,
+                message,
+                reply_markup=keyboard,
+                parse_mode="Markdown"
+            )
+        except Exception as e:
+            logger.error(f"Error in on_admin_users: {str(e)}\nMessage: {message}")
+            await edit_text_if_changed(
+                callback.message,
+                "❌ Произошла ошибка при форматировании сообщения",
+                reply_markup=keyboard
+            )
     
-    await callback.answer()
+    # Edit and callback answer are independent requests, send them together
+    await asyncio.gather(edit_message(), callback.answer())
 
-@router.callback_query(F.data.startswith("users_page:"))
-async def handle_users_page(callback: types.CallbackQuery, db: Database):
+@router.callback_query(F.data.regexp(r"users_page:(\d+)$").as_("page_match"))
+async def handle_users_page(callback: types.CallbackQuery, db: Database, page_match: re.Match):
     """Handle users page navigation."""
-    page = int(callback.data.split(":")[1])
+    page = int(page_match.group(1))
     
     users_data = await db.get_all_users(page=page)
-    users = users_data["users"]
     
-    message = "👥 Список пользователей:\n\n"
-    message += "\n\n".join([format_user_info(user) for user in users])
-    message += f"\n\nВсего пользователей: {users_data['total_users']}"
+    message = format_users_list(users_data)
     
     keyboard = get_users_pagination_keyboard(
         current_page=users_data["current_page"],
@@ -98,15 +104,16 @@ async def handle_users_page(callback: types.CallbackQuery, db: Database):
     )
     
     try:
-        await callback.message.edit_text(
-            text=message,
+        await edit_text_if_changed(
+            callback.message,
+            message,
             reply_markup=keyboard,
             parse_mode="Markdown"
         )
     except Exception as e:
-        logger = get_logger(__name__)
         logger.error(f"Error in handle_users_page: {str(e)}\nMessage: {message}")
-        await callback.message.edit_text(
+        await edit_text_if_changed(
+            callback.message,
             "❌ Произошла ошибка при форматировании сообщения",
             reply_markup=keyboard
         )
@@ -116,16 +123,9 @@ async def handle_users_page(callback: types.CallbackQuery, db: Database):
 @router.message(Command("users"))
 async def cmd_users(message: types.Message, db: Database, settings: Settings):
     """Show list of users."""
-    if not await is_admin(message.from_user.id, settings):
-        await message.answer("❌ У вас нет прав администратора")
-        return
-
     users_data = await db.get_all_users(page=1)
-    users = users_data["users"]
     
-    message_text = "👥 Список пользователей:\n\n"
-    message_text += "\n\n".join([format_user_info(user) for user in users])
-    message_text += f"\n\nВсего пользователей: {users_data['total_users']}"
+    message_text = format_users_list(users_data)
     
     keyboard = get_users_pagination_keyboard(
         current_page=users_data["current_page"],
@@ -145,25 +145,46 @@ async def cmd_subscriptions(
     settings: Settings
 ):
     """Subscriptions list handler."""
-    if not await is_admin(message.from_user.id, settings):
-        await message.answer("❌ У вас нет прав администратора")
-        return
-
-    subscriptions = await db.get_all_subscriptions()
-    if not subscriptions:
+    subscriptions_data = await db.get_subscriptions_page(page=1)
+    if not subscriptions_data["subscriptions"]:
         await message.answer("💳 Подписок пока нет")
         return
 
-    text = "💳 Список подписок:\n\n"
-    for sub in subscriptions:
-        text += format_subscription_info(sub) + "\n"
-
     await message.answer(
-        text,
-        reply_markup=get_subscriptions_keyboard(),
+        format_subscriptions_list(subscriptions_data),
+        reply_markup=get_subscriptions_pagination_keyboard(
+            current_page=subscriptions_data["current_page"],
+            total_pages=subscriptions_data["total_pages"]
+        ),
         parse_mode="Markdown"
     )
 
+@router.callback_query(F.data.regexp(r"subs_page:(\d+)$").as_("page_match"))
+async def handle_subscriptions_page(callback: types.CallbackQuery, db: Database, page_match: re.Match):
+    """Handle subscriptions page navigation."""
+    page = int(page_match.group(1))
+
+    subscriptions_data = await db.get_subscriptions_page(page=page)
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            format_subscriptions_list(subscriptions_data),
+            reply_markup=get_subscriptions_pagination_keyboard(
+                current_page=subscriptions_data["current_page"],
+                total_pages=subscriptions_data["total_pages"]
+            ),
+            parse_mode="Markdown"
+        ),
+        callback.answer()
+    )
+
+def read_log_tail(path: str, size: int) -> bytes:
+    """Read the last `size` bytes of a file without reading the whole file."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - size))
+        return f.read()
+
 @router.message(Command("logs"))
 async def cmd_logs(message: types.Message, settings: Settings):
     """Send bot logs."""
@@ -171,26 +192,22 @@ async def cmd_logs(message: types.Message, settings: Settings):
         # Отправляем оба файла логов
         for log_file in ["logs/errors.log", "logs/priceguard.log"]:
             try:
-                with open(log_file, "r") as f:
-                    logs = f.read()[-4000:]  # Last 4000 chars
+                logs = await asyncio.to_thread(read_log_tail, log_file, LOG_TAIL_BYTES)
                 await message.answer_document(
                     types.BufferedInputFile(
-                        logs.encode(),
+                        logs,
                         filename=f"{log_file.split('/')[-1]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
                     )
                 )
             except Exception as e:
                 await message.answer(f"❌ Ошибка при чтении {log_file}: {str(e)}")
-    except Exception as e:
+    except Exception:
+        logger.exception("Failed to send log files")
         await message.answer("❌ Произошла общая ошибка при обработке логов")
 
 @router.message(Command("broadcast"))
 async def cmd_broadcast(message: types.Message, state: FSMContext, settings: Settings):
     """Start broadcast message handler."""
-    if not await is_admin(message.from_user.id, settings):
-        await message.answer("❌ У вас нет прав администратора")
-        return
-
     await state.set_state(AdminStates.waiting_for_broadcast)
     await message.answer(
         "📢 Отправьте сообщение для рассылки всем пользователям\n"
@@ -204,10 +221,6 @@ async def cmd_force_check(
     settings: Settings
 ):
     """Force check promotions handler."""
-    if not await is_admin(message.from_user.id, settings):
-        await message.answer("❌ У вас нет прав администратора")
-        return
-
     await state.set_state(AdminStates.waiting_for_force_check)
     await message.answer(
         "🔄 Отправьте ID пользователя для принудительной проверки акций\n"
@@ -221,27 +234,33 @@ async def process_broadcast(
     db: Database
 ):
     """Process broadcast message."""
-    users_data = await db.get_all_users()
-    users = users_data["users"]  # Получаем список пользователей из словаря
-    sent_count = 0
-    failed_count = 0
+    user_ids = await db.get_all_user_ids()
     error_details = []
 
-    for user in users:
-        try:
-            # Проверяем, что у пользователя есть валидный ID в словаре
-            user_id = user.get('user_id')  # Используем 'user_id' вместо 'id'
-            if not user_id:
-                raise ValueError(f"Missing user_id in user data: {user}")
-                
-            # Пробуем отправить сообщение
-            await message.copy_to(chat_id=user_id)
-            sent_count += 1
-            
-        except Exception as e:
-            failed_count += 1
-            error_details.append(f"User {user.get('user_id', 'Unknown')}: {str(e)}")
-            print(f"Broadcast error for user {user.get('user_id', 'Unknown')}: {str(e)}")  # Для отладки
+    # Параллельная отправка с ограничением числа запросов и темпа (лимит Telegram ~30 сообщений/с)
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    rate_limiter = RateLimiter(
+        requests_per_minute=BROADCAST_RATE_PER_SECOND * 60,
+        min_interval=1 / BROADCAST_RATE_PER_SECOND
+    )
+    rate_lock = asyncio.Lock()
+
+    async def send_to_user(user_id: int) -> bool:
+        async with semaphore:
+            async with rate_lock:
+                await rate_limiter.acquire()
+            try:
+                # Ответ 429 ждёт и повторяет FloodControlMiddleware сессии бота
+                await message.copy_to(chat_id=user_id)
+                return True
+            except Exception as e:
+                error_details.append(f"User {user_id}: {str(e)}")
+                logger.debug("Broadcast error for user %s: %s", user_id, e)
+                return False
+
+    results = await asyncio.gather(*(send_to_user(user_id) for user_id in user_ids))
+    sent_count = sum(results)
+    failed_count = len(error_details)
 
     # Формируем детальный отчет
     report = f"📢 Рассылка завершена\n✅ Успешно: {sent_count}\n❌ Ошибок: {failed_count}"
@@ -289,6 +308,7 @@ async def process_force_check(
     except ValueError:
         await message.answer("❌ Некорректный ID пользователя")
     except Exception as e:
+        logger.exception(f"Forced promotion check failed for user {message.text}")
         await message.answer(f"❌ Ошибка при проверке акций: {str(e)}")
     finally:
         await state.clear()
@@ -297,7 +317,8 @@ async def process_force_check(
 @router.callback_query(F.data == "admin_subscriptions")
 async def on_admin_subscriptions(callback: types.CallbackQuery, settings: Settings):
     """Handle admin_subscriptions callback."""
-    await callback.message.edit_text(
+    await edit_text_if_changed(
+        callback.message,
         "💳 Управление подписками",
         reply_markup=get_subscriptions_keyboard(),
         parse_mode="Markdown"
@@ -307,7 +328,8 @@ async def on_admin_subscriptions(callback: types.CallbackQuery, settings: Settin
 async def on_admin_broadcast(callback: types.CallbackQuery, state: FSMContext, settings: Settings):
     """Handle admin_broadcast callback."""
     await state.set_state(AdminStates.waiting_for_broadcast)
-    await callback.message.edit_text(
+    await edit_text_if_changed(
+        callback.message,
         "📢 Введите текст для рассылки:",
         reply_markup=None,
         parse_mode="Markdown"
@@ -329,82 +351,90 @@ async def on_admin_logs(callback: types.CallbackQuery, settings: Settings):
 async def on_admin_force_check(callback: types.CallbackQuery, state: FSMContext, settings: Settings):
     """Handle admin_force_check callback."""
     await state.set_state(AdminStates.waiting_for_force_check)
-    await callback.message.edit_text(
+    await edit_text_if_changed(
+        callback.message,
         "🔄 Введите ID пользователя для проверки акций:",
         reply_markup=None,
         parse_mode="Markdown"
     )
 
+def _format_date(value: Union[str, datetime]) -> str:
+    """Format an ISO date (YYYY-MM-DD...) as DD.MM.YYYY without parsing it."""
+    if isinstance(value, datetime):
+        return value.strftime('%d.%m.%Y')
+    return f"{value[8:10]}.{value[5:7]}.{value[0:4]}"
+
 @router.callback_query(F.data == "admin_active_subs")
 async def on_admin_active_subs(callback: types.CallbackQuery, db: Database, settings: Settings):
     """Handle admin_active_subs callback."""
-    subscriptions = await db.get_active_subscriptions()
+    subscriptions = await db.get_active_subscriptions_with_users()
     if not subscriptions:
         text = "❌ Активных подписок не найдено"
     else:
-        text = "✅ Активные подписки:\n\n"
-        for sub in subscriptions:
-            user = await db.get_user(sub["user_id"])
-            if user:
-                text += f"👤 ID: {user['user_id']}\n"
-                text += f"📅 До: {datetime.fromisoformat(sub['end_date']).strftime('%d.%m.%Y')}\n"
-                text += f"⏱ Интервал проверки: {sub['check_interval']} ч.\n\n"
-
-    await callback.message.edit_text(
-        text,
-        reply_markup=get_subscriptions_keyboard(),
-        parse_mode="Markdown"
+        parts = ["✅ Активные подписки:\n\n"]
+        parts.extend(
+            f"👤 ID: {sub['user_id']}\n"
+            f"📅 До: {_format_date(sub['end_date'])}\n"
+            f"⏱ Интервал проверки: {sub['check_interval'] // 3600} ч.\n\n"
+            for sub in subscriptions
+        )
+        text = "".join(parts)
+
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            text,
+            reply_markup=get_subscriptions_keyboard(),
+            parse_mode="Markdown"
+        ),
+        callback.answer()
     )
-    await callback.answer()
 
 @router.callback_query(F.data == "admin_inactive_subs")
 async def on_admin_inactive_subs(callback: types.CallbackQuery, db: Database, settings: Settings):
     """Handle admin_inactive_subs callback."""
-    async with db.db.execute(
-        """
-        SELECT s.*, u.check_interval
-        FROM subscriptions s
-        JOIN users u ON s.user_id = u.user_id
-        WHERE u.subscription_status = 'inactive'
-        OR s.end_date <= CURRENT_TIMESTAMP
-        """
-    ) as cursor:
-        rows = await cursor.fetchall()
-        subscriptions = [
-            {
-                "user_id": row[1],
-                "payment_id": row[2],
-                "start_date": row[3],
-                "end_date": row[4],
-                "check_interval": row[5]
-            }
-            for row in rows
-        ]
-
+    subscriptions = await db.get_inactive_subscriptions()
     if not subscriptions:
         text = "✅ Неактивных подписок не найдено"
     else:
-        text = "❌ Неактивные подписки:\n\n"
-        for sub in subscriptions:
-            user = await db.get_user(sub["user_id"])
-            if user:
-                text += f"👤 ID: {user['user_id']}\n"
-                text += f"📅 Истекла: {datetime.fromisoformat(sub['end_date']).strftime('%d.%m.%Y')}\n"
-                text += f"⏱ Интервал проверки: {sub['check_interval']} ч.\n\n"
-
-    await callback.message.edit_text(
-        text,
-        reply_markup=get_subscriptions_keyboard(),
-        parse_mode="Markdown"
+        parts = ["❌ Неактивные подписки:\n\n"]
+        parts.extend(
+            f"👤 ID: {sub['user_id']}\n"
+            f"📅 Истекла: {_format_date(sub['end_date'])}\n"
+            f"⏱ Интервал проверки: {sub['check_interval'] // 3600} ч.\n\n"
+            for sub in subscriptions
+        )
+        text = "".join(parts)
+
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            text,
+            reply_markup=get_subscriptions_keyboard(),
+            parse_mode="Markdown"
+        ),
+        callback.answer()
     )
-    await callback.answer()
 
 @router.callback_query(F.data == "admin_back")
 async def on_admin_back(callback: types.CallbackQuery, settings: Settings):
     """Handle admin_back callback."""
-    await callback.message.edit_text(
-        "🤖 Панель администратора",
-        reply_markup=get_admin_keyboard(),
-        parse_mode="Markdown"
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            "🤖 Панель администратора",
+            reply_markup=get_admin_keyboard(),
+            parse_mode="Markdown"
+        ),
+        callback.answer()
     )
-    await callback.answer()
+
+@denied_router.message(Command("admin", "users", "subscriptions", "logs", "broadcast", "force_check"))
+async def deny_admin_command(message: types.Message):
+    """Reply to admin commands sent by non-admins."""
+    await message.answer(DENY_MSG)
+
+@denied_router.callback_query(F.data.startswith("admin_") | F.data.regexp(r"(users|subs)_page:\d+$"))
+async def deny_admin_callback(callback: types.CallbackQuery):
+    """Answer admin buttons pressed by non-admins."""
+    await callback.answer(DENY_ALERT, show_alert=True)
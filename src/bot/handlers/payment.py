@@ -3,8 +3,9 @@ Payment handlers for the PriceGuard bot.
 File: src/bot/handlers/payment.py
 """
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from aiogram import Router, F, types
 from aiogram.filters import Command, StateFilter
@@ -14,10 +15,11 @@ from aiogram.types import LabeledPrice, PreCheckoutQuery
 
 from core.config import Settings
 from core.database import Database
-from bot.keyboards.payment import get_subscription_plans_keyboard
+from core.logging import get_logger
 from bot.utils.messages import format_subscription_info
 
 router = Router()
+logger = get_logger(__name__)
 
 SUBSCRIPTION_PRICES = {
     1: 299,   # 1 month
@@ -26,54 +28,61 @@ SUBSCRIPTION_PRICES = {
     12: 2699  # 12 months
 }
 
+# Invoice title, description, prices and payload for every plan, built once
+_INVOICE_PARAMS: Dict[int, Tuple[str, str, List[LabeledPrice], str]] = {
+    months: (
+        f"Подписка на {months} мес.",
+        (
+            f"Доступ ко всем функциям бота на {months} месяцев\n"
+            "• Мониторинг акций\n"
+            "• Уведомления об изменениях"
+        ),
+        [
+            LabeledPrice(
+                label=f"Подписка на {months} мес.",
+                amount=amount * 100  # Amount in kopecks
+            )
+        ],
+        f"sub_{months}"
+    )
+    for months, amount in SUBSCRIPTION_PRICES.items()
+}
+
+# Plan callback data and invoice payloads mapped straight to the number of months
+_MONTHS_BY_DATA = {f"subscribe_{months}": months for months in SUBSCRIPTION_PRICES}
+_MONTHS_BY_PAYLOAD = {params[3]: months for months, params in _INVOICE_PARAMS.items()}
+
 class PaymentStates(StatesGroup):
     """Payment FSM states."""
     selecting_plan = State()
 
-@router.callback_query(F.data == "subscribe")
-async def process_subscribe(callback: types.CallbackQuery, state: FSMContext):
-    """Handle subscription request."""
-    await state.set_state(PaymentStates.selecting_plan)
-    await callback.message.edit_text(
-        "💳 Выберите план подписки:",
-        reply_markup=get_subscription_plans_keyboard()
-    )
-    await callback.answer()
-
 @router.callback_query(F.data.startswith("subscribe_"))
 async def process_plan_selection(
     callback: types.CallbackQuery,
     settings: Settings
 ):
     """Handle subscription plan selection."""
-    months = int(callback.data.split("_")[1])
-    amount = SUBSCRIPTION_PRICES[months]
+    months = _MONTHS_BY_DATA[callback.data]
+    title, description, prices, payload = _INVOICE_PARAMS[months]
     
-    await callback.bot.send_invoice(
-        chat_id=callback.from_user.id,
-        title=f"Подписка на {months} мес.",
-        description=(
-            f"Доступ ко всем функциям бота на {months} месяцев\n"
-            "• Мониторинг акций\n"
-            "• Уведомления об изменениях"
+    await asyncio.gather(
+        callback.bot.send_invoice(
+            chat_id=callback.from_user.id,
+            title=title,
+            description=description,
+            payload=payload,
+            provider_token=settings.telegram.payment_provider_token,
+            currency="RUB",
+            prices=prices,
+            start_parameter="subscribe",
+            need_name=True,
+            need_phone_number=False,
+            need_email=True,
+            need_shipping_address=False,
+            is_flexible=False
         ),
-        payload=f"sub_{months}",
-        provider_token=settings.telegram.payment_provider_token,
-        currency="RUB",
-        prices=[
-            LabeledPrice(
-                label=f"Подписка на {months} мес.",
-                amount=amount * 100  # Amount in kopecks
-            )
-        ],
-        start_parameter="subscribe",
-        need_name=True,
-        need_phone_number=False,
-        need_email=True,
-        need_shipping_address=False,
-        is_flexible=False
+        callback.answer()
     )
-    await callback.answer()
 
 @router.pre_checkout_query()
 async def process_pre_checkout(
@@ -82,6 +91,18 @@ async def process_pre_checkout(
 ):
     """Handle pre-checkout query."""
     try:
+        # The payload is mapped to a plan only after the money is taken
+        if pre_checkout_query.invoice_payload not in _MONTHS_BY_PAYLOAD:
+            logger.warning(
+                f"Unknown invoice payload {pre_checkout_query.invoice_payload!r} "
+                f"from user {pre_checkout_query.from_user.id}"
+            )
+            await pre_checkout_query.answer(
+                ok=False,
+                error_message="Неизвестный тариф. Выберите план подписки заново."
+            )
+            return
+
         # Check if user exists
         user = await db.get_user(pre_checkout_query.from_user.id)
         if not user:
@@ -92,7 +113,9 @@ async def process_pre_checkout(
             return
 
         await pre_checkout_query.answer(ok=True)
-    except Exception as e:
+    except Exception:
+        # Pre-checkout must always be answered, otherwise the payment hangs
+        logger.exception(f"Pre-checkout failed for user {pre_checkout_query.from_user.id}")
         await pre_checkout_query.answer(
             ok=False,
             error_message="Произошла ошибка. Попробуйте позже."
@@ -106,57 +129,52 @@ async def process_successful_payment(
     """Handle successful payment."""
     try:
         payload = message.successful_payment.invoice_payload
-        months = int(payload.split("_")[1])
+        months = _MONTHS_BY_PAYLOAD[payload]
         
         # Get current subscription if exists
         current_subscription = await db.get_subscription(message.from_user.id)
         
         # Calculate subscription dates
-        start_date = datetime.now()
-        if current_subscription and current_subscription.get("is_active"):
-            # If user has active subscription, extend it
-            current_end = datetime.fromisoformat(current_subscription.get("end_date"))
-            if current_end > start_date:
-                # If current subscription hasn't expired, start from its end date
-                start_date = current_end
+        now = datetime.now()
+        current_end = (
+            datetime.fromisoformat(current_subscription["end_date"])
+            if current_subscription and current_subscription.get("is_active")
+            else now
+        )
+        # An unexpired subscription is extended from its end date
+        start_date = max(now, current_end)
         
         # Add new period to start date
         end_date = start_date + timedelta(days=30 * months)
         
-        # Create payment record first
+        # Payment, subscription and user status are written in one transaction
         payment_id = str(message.successful_payment.provider_payment_charge_id)
-        await db.create_payment({
-            "id": payment_id,
-            "user_id": message.from_user.id,
-            "amount": float(message.successful_payment.total_amount) / 100,  # Convert from kopeks to rubles
-            "status": "completed",
-            "months": months,
-            "created_at": datetime.now().isoformat()
-        })
-
-        # Create subscription
-        await db.create_subscription({
-            "user_id": message.from_user.id,
-            "payment_id": payment_id,
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "is_active": True
-        })
-
-        # Update user's subscription status
-        await db.update_subscription(
-            user_id=message.from_user.id,
-            status="active",
-            end_date=end_date
+        subscription = await db.activate_subscription(
+            payment_data={
+                "id": payment_id,
+                "user_id": message.from_user.id,
+                "amount": float(message.successful_payment.total_amount) / 100,  # Convert from kopeks to rubles
+                "status": "completed",
+                "months": months,
+                "created_at": now
+            },
+            subscription_data={
+                "user_id": message.from_user.id,
+                "payment_id": payment_id,
+                "start_date": start_date,
+                "end_date": end_date,
+                "is_active": True
+            }
         )
 
-        subscription = await db.get_subscription(message.from_user.id)
         await message.answer(
             "✅ Оплата прошла успешно!\n\n"
             f"{format_subscription_info(subscription)}",
             parse_mode="Markdown"
         )
-    except Exception as e:
+    except Exception:
+        # The user has already been charged, so they always get a reply
+        logger.exception(f"Failed to activate subscription for user {message.from_user.id}")
         await message.answer(
             "❌ Произошла ошибка при активации подписки.\n"
             "Пожалуйста, обратитесь в поддержку."
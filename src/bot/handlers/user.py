@@ -3,25 +3,34 @@ User command handlers for the PriceGuard bot.
 File: src/bot/handlers/user.py
 """
 
+import asyncio
+import re
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Union
+from typing import Dict, Optional, Set, Union
 
+import aiosqlite
 from aiogram import Router, F, Bot
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import Message, CallbackQuery, BotCommand, BotCommandScopeDefault, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message, CallbackQuery, BotCommand, BotCommandScopeDefault
 
 from core.database import Database
 from core.logging import get_logger
 from services.marketplaces.factory import MarketplaceFactory
 from services.monitoring.monitor import PromotionMonitor
+from bot.utils.edit import edit_text_if_changed
 from bot.utils.messages import (
     format_help_message,
     format_subscription_status,
     format_api_keys_message,
-    format_faq_message
+    FAQ_MESSAGE,
+    NOT_REGISTERED_MESSAGE,
+    SETTINGS_MESSAGE,
+    CHECK_INTERVAL_MESSAGE,
+    SUBSCRIPTION_PLANS_MESSAGE,
+    DELETE_KEYS_CONFIRM_MESSAGE,
+    UNSUBSCRIBE_CONFIRM_MESSAGE
 )
 from ..utils.messages import (
     format_start_message,
@@ -38,7 +47,9 @@ from ..keyboards.user import (
     get_settings_keyboard,
     get_api_key_keyboard,
     get_confirmation_keyboard,
-    get_main_menu_keyboard
+    get_main_menu_keyboard,
+    get_help_keyboard,
+    get_faq_keyboard
 )
 from ..keyboards.payment import (
     get_subscription_keyboard,
@@ -48,6 +59,24 @@ from ..keyboards.payment import (
 router = Router()
 logger = get_logger(__name__)
 
+# Ozon credentials are sent as CLIENT_ID:API_KEY; length bounds reject
+# obvious typos before a request to the API is made
+_OZON_KEY_RE = re.compile(r"\s*(\d{1,12})\s*:\s*(\S{30,128})\s*")
+# Wildberries API keys are JWTs: three base64url segments separated by dots
+_WB_KEY_RE = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+_WB_KEY_MIN_LENGTH = 100
+# Intervals offered by the settings keyboard: hours -> "N час(а/ов)"
+_CHECK_INTERVAL_TEXT = {
+    1: "1 час",
+    2: "2 часа",
+    4: "4 часа",
+    12: "12 часов",
+    24: "24 часа",
+}
+# Users whose API key is being validated; a second key sent meanwhile is
+# rejected instead of starting another validation and write
+_validating_users: Set[int] = set()
+
 class UserStates(StatesGroup):
     """User state machine for conversation handling."""
     waiting_for_ozon_api = State()
@@ -55,242 +84,144 @@ class UserStates(StatesGroup):
     waiting_for_interval = State()
     waiting_for_confirmation = State()
 
+_BOT_COMMANDS = [
+    BotCommand(command="start", description="🚀 Запустить бота"),
+    BotCommand(command="my_promotions", description="📊 Акции"),
+    BotCommand(command="settings", description="⚙️ Настройки"),
+    BotCommand(command="add_api", description="🔑 API ключи"),
+    BotCommand(command="status", description="💳 Статус подписки"),
+    BotCommand(command="help", description="❓ Помощь")
+]
+
 async def setup_bot_commands(bot: Bot):
     """Setup bot commands."""
-    commands = [
-        BotCommand(command="start", description="🚀 Запустить бота"),
-        BotCommand(command="my_promotions", description="📊 Акции"),
-        BotCommand(command="settings", description="⚙️ Настройки"),
-        BotCommand(command="add_api", description="🔑 API ключи"),
-        BotCommand(command="status", description="💳 Статус подписки"),
-        BotCommand(command="help", description="❓ Помощь")
-    ]
-    await bot.set_my_commands(commands)
+    await bot.set_my_commands(_BOT_COMMANDS)
 
 @router.message(Command("start"))
 async def cmd_start(message: Message, db: Database):
     """Handle /start command."""
-    user = await db.get_user(message.from_user.id)
-    if not user:
-        await db.add_user(message.from_user.id)
+    is_new = await db.register_user(message.from_user.id)
     
     await message.answer(
-        text=format_start_message(is_registered=bool(user)),
+        text=format_start_message(is_registered=not is_new),
         reply_markup=get_start_keyboard()
     )
 
 @router.callback_query(F.data == "how_it_works")
 async def process_how_it_works(callback: CallbackQuery):
     """Handle 'How it works' button press."""
-    try:
-        await callback.message.edit_text(
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             text=HOW_IT_WORKS_MESSAGE + "\u200b",
             reply_markup=get_start_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "start_setup")
 async def process_start_setup(callback: CallbackQuery):
     """Handle 'Start setup' button press."""
-    try:
-        await callback.message.edit_text(
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             text=START_SETUP_MESSAGE + "\u200b",
             reply_markup=get_api_key_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
-@router.callback_query(F.data == "add_ozon_key")
-async def process_add_ozon_key(callback: CallbackQuery, state: FSMContext):
-    """Handle Ozon API key addition."""
-    try:
-        await state.set_state(UserStates.waiting_for_ozon_api)
-        await callback.message.edit_text(
-            text=OZON_API_KEY_INSTRUCTION + "\u200b",
+# Callback data of the "add key" buttons -> (instruction, state waiting for the key)
+_ADD_API_KEY_ACTIONS = {
+    "add_ozon_key": (OZON_API_KEY_INSTRUCTION + "\u200b", UserStates.waiting_for_ozon_api),
+    "add_wb_key": (WILDBERRIES_API_KEY_INSTRUCTION + "\u200b", UserStates.waiting_for_wb_api)
+}
+
+@router.callback_query(F.data.in_(_ADD_API_KEY_ACTIONS.keys()))
+async def process_add_api_key(callback: CallbackQuery, state: FSMContext):
+    """Handle Ozon or Wildberries API key addition."""
+    instruction, key_state = _ADD_API_KEY_ACTIONS[callback.data]
+    await state.set_state(key_state)
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            instruction,
             reply_markup=get_api_key_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
-
-@router.callback_query(F.data == "add_wb_key")
-async def process_add_wb_key(callback: CallbackQuery, state: FSMContext):
-    """Handle Wildberries API key addition."""
-    await state.set_state(UserStates.waiting_for_wb_api)
-    await callback.message.edit_text(
-        text=WILDBERRIES_API_KEY_INSTRUCTION + "\u200b",
-        reply_markup=get_api_key_keyboard()
+        ),
+        callback.answer()
     )
-    await callback.answer()
 
 @router.callback_query(F.data == "back_to_main")
 async def process_back_to_main(callback: CallbackQuery):
     """Handle back to main menu button press."""
-    try:
-        await callback.message.edit_text(
-            text=START_MESSAGE + "\u200b",
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            START_MESSAGE + "\u200b",
             reply_markup=get_start_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.message(Command("help"))
-async def cmd_help(message: Message, db: Database, marketplace_factory: MarketplaceFactory) -> None:
+async def cmd_help(message: Message, user_data: Optional[Dict], marketplace_factory: MarketplaceFactory) -> None:
     """Handle /help command."""
-    user_data = await db.get_user(message.from_user.id)
     await message.answer(
         await format_help_message(user_data, marketplace_factory),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="🤔 Как это работает?",
-                        callback_data="how_it_works"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="❓ Частые вопросы",
-                        callback_data="show_faq"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="👨‍💻 Тех. поддержка",
-                        url="https://t.me/plmkr78"
-                    )
-                ]
-            ]
-        ),
+        reply_markup=get_help_keyboard(),
         parse_mode="HTML"
     )
 
 @router.callback_query(F.data == "show_faq")
 async def process_faq(callback: CallbackQuery):
     """Handle FAQ button press."""
-    try:
-        await callback.message.edit_text(
-            format_faq_message(),
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="◀️ Назад",
-                            callback_data="back_to_help"
-                        )
-                    ]
-                ]
-            ),
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            FAQ_MESSAGE,
+            reply_markup=get_faq_keyboard(),
             parse_mode="HTML"
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "back_to_help")
-async def process_back_to_help(callback: CallbackQuery, db: Database, marketplace_factory: MarketplaceFactory):
+async def process_back_to_help(callback: CallbackQuery, user_data: Optional[Dict], marketplace_factory: MarketplaceFactory):
     """Handle back to help button press."""
-    try:
-        user_data = await db.get_user(callback.from_user.id)
-        await callback.message.edit_text(
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             await format_help_message(user_data, marketplace_factory),
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="🤔 Как это работает?",
-                            callback_data="how_it_works"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="❓ Частые вопросы",
-                            callback_data="show_faq"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="👨‍💻 Тех. поддержка",
-                            url="https://t.me/plmkr78"
-                        )
-                    ]
-                ]
-            ),
+            reply_markup=get_help_keyboard(),
             parse_mode="HTML"
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
-@router.message(Command("status"))
-async def cmd_status(message: Message, db: Database) -> None:
+@router.message(Command("status"), flags={"require_registered": True})
+async def cmd_status(message: Message, user_data: Dict) -> None:
     """Handle /status command."""
-    user_data = await db.get_user(message.from_user.id)
-    if not user_data:
-        await message.answer("❌ Вы не зарегистрированы. Используйте /start")
-        return
-        
     await message.answer(
-        await format_subscription_status(user_data),
+        format_subscription_status(user_data),
         reply_markup=get_subscription_keyboard()
     )
 
-@router.message(Command("settings"))
-async def cmd_settings(message: Message, db: Database) -> None:
+@router.message(Command("settings"), flags={"require_registered": True})
+async def cmd_settings(message: Message) -> None:
     """Handle /settings command."""
-    user_data = await db.get_user(message.from_user.id)
-    if not user_data:
-        await message.answer("❌ Вы не зарегистрированы. Используйте /start")
-        return
-        
     await message.answer(
         "⚙️ Выберите интервал проверки акций:",
         reply_markup=get_settings_keyboard()
     )
 
-@router.message(Command("add_api"))
-async def cmd_add_api(message: Message, db: Database) -> None:
+@router.message(Command("add_api"), flags={"require_registered": True})
+async def cmd_add_api(message: Message) -> None:
     """Handle /add_api command."""
-    user_data = await db.get_user(message.from_user.id)
-    if not user_data:
-        await message.answer("❌ Вы не зарегистрированы. Используйте /start")
-        return
-        
     await message.answer(
         "🔑 Выберите маркетплейс для добавления API ключа:",
         reply_markup=get_api_key_keyboard()
     )
 
-@router.callback_query(F.data == "add_ozon_api")
-async def process_add_ozon_api(callback: CallbackQuery, state: FSMContext) -> None:
-    """Handle Ozon API key addition."""
-    await callback.message.edit_text(
-        format_api_instructions("ozon"),
-        reply_markup=None
-    )
-    await state.set_state(UserStates.waiting_for_ozon_api)
-    await callback.answer()
-
-@router.callback_query(F.data == "add_wb_api")
-async def process_add_wb_api(callback: CallbackQuery, state: FSMContext) -> None:
-    """Handle Wildberries API key addition."""
-    await callback.message.edit_text(
-        format_api_instructions("wildberries"),
-        reply_markup=None
-    )
-    await state.set_state(UserStates.waiting_for_wb_api)
-    await callback.answer()
-
 @router.message(UserStates.waiting_for_ozon_api)
 async def process_ozon_api_key(
     message: Message,
@@ -299,85 +230,68 @@ async def process_ozon_api_key(
     marketplace_factory: MarketplaceFactory
 ) -> None:
     """Process Ozon API key submission."""
+    if message.from_user.id in _validating_users:
+        await message.answer("⏳ Предыдущий ключ ещё проверяется, дождитесь результата")
+        return
+    _validating_users.add(message.from_user.id)
     try:
-        api_key = message.text.strip()
-        if not api_key:
+        if not message.text or not message.text.strip():
             await message.answer("❌ API ключ не может быть пустым")
             return
             
-        parts = api_key.split(':')
-        if len(parts) != 2:
+        match = _OZON_KEY_RE.fullmatch(message.text)
+        if not match:
             await message.answer(
                 "❌ Неверный формат. Отправьте ключ в формате CLIENT_ID:API_KEY"
             )
             return
             
-        client_id, api_key = parts
+        client_id, api_key = match.groups()
         logger.info(f"Parsed API key - Client ID: {client_id}, Key length: {len(api_key)}")
         
-        await message.answer("🔄 Проверяю API ключ...")
-        
-        # Создаем клиента с незашифрованным ключом для проверки
-        logger.info("Creating Ozon client for validation")
-        client = await marketplace_factory.create_client(
-            'ozon', api_key, client_id=client_id, is_encrypted=False
-        )
-        
-        # Проверяем валидность ключа
+        # Проверяем валидность незашифрованного ключа, пока отправляется сообщение о проверке
         logger.info("Starting API key validation")
-        async with client:
-            is_valid = await client.validate_api_key()
-            logger.info(f"API key validation result: {is_valid}")
-            if not is_valid:
-                # Обновляем статус на api_added при неудачной попытке
-                await db.db.execute(
-                    "UPDATE users SET setup_status = 'api_added' WHERE user_id = ?",
-                    (message.from_user.id,)
-                )
-                await db.db.commit()
-                await message.answer("❌ Неверный API ключ")
-                return
+        progress, is_valid = await asyncio.gather(
+            message.answer("🔄 Проверяю API ключ..."),
+            marketplace_factory.validate_key('ozon', api_key, client_id=client_id)
+        )
+        logger.info(f"API key validation result: {is_valid}")
+        if not is_valid:
+            # Обновляем статус на api_added при неудачной попытке
+            await db.set_setup_status(message.from_user.id, 'api_added')
+            await progress.edit_text("❌ Неверный API ключ")
+            return
         
         # Если ключ валидный, шифруем и сохраняем
         logger.info("Encrypting API key")
-        encrypted_key = marketplace_factory.encrypt_api_key(api_key)
+        encrypted_key = await asyncio.to_thread(marketplace_factory.encrypt_api_key, api_key)
         
         # Сохраняем API ключ и client_id в одной транзакции
         logger.info("Saving API credentials to database")
-        await db.db.execute(
-            """
-            UPDATE users 
-            SET ozon_api_key = ?,
-                ozon_client_id = ?
-            WHERE user_id = ?
-            """,
-            (encrypted_key, client_id, message.from_user.id)
-        )
-        await db.db.commit()
+        await db.update_ozon_credentials(message.from_user.id, encrypted_key, client_id)
             
-        await message.answer(
+        # Результат и состояние ключей показываем одним сообщением вместо трёх
+        user_data = await db.get_user(message.from_user.id)
+        await progress.edit_text(
             "✅ API ключ Ozon успешно добавлен!\n\n"
             "Теперь вы можете:\n"
             "1️⃣ Настроить интервал проверки в разделе ⚙️ Настройки\n"
-            "2️⃣ Начать отслеживать акции в разделе 📊 Мои акции",
-            reply_markup=get_main_menu_keyboard()
+            "2️⃣ Начать отслеживать акции в разделе 📊 Мои акции\n\n"
+            + await format_api_keys_message(user_data),
+            reply_markup=get_api_key_keyboard()
         )
-        await show_api_keys_message(message, db)
         
-    except Exception as e:
-        logger.error(f"Error adding Ozon API key: {str(e)}")
+    except Exception:
+        logger.exception(f"Error adding Ozon API key for user {message.from_user.id}")
         # Обновляем статус на api_added при любой ошибке валидации
-        await db.db.execute(
-            "UPDATE users SET setup_status = 'api_added' WHERE user_id = ?",
-            (message.from_user.id,)
-        )
-        await db.db.commit()
+        await db.set_setup_status(message.from_user.id, 'api_added')
         await message.answer(
             "❌ Ошибка при проверке API ключа. " 
             "Проверьте правильность ввода и попробуйте снова."
         )
     finally:
         await state.clear()
+        _validating_users.discard(message.from_user.id)
 
 @router.message(UserStates.waiting_for_wb_api)
 async def process_wb_api_key(
@@ -387,57 +301,53 @@ async def process_wb_api_key(
     marketplace_factory: MarketplaceFactory
 ) -> None:
     """Process Wildberries API key submission."""
+    if message.from_user.id in _validating_users:
+        await message.answer("⏳ Предыдущий ключ ещё проверяется, дождитесь результата")
+        return
+    _validating_users.add(message.from_user.id)
     try:
-        api_key = message.text.strip()
+        # JWT keys never contain whitespace; drop line breaks a paste may add
+        api_key = "".join((message.text or "").split())
         if not api_key:
             await message.answer("❌ API ключ не может быть пустым")
             return
+            
+        if len(api_key) < _WB_KEY_MIN_LENGTH or not _WB_KEY_RE.fullmatch(api_key):
+            await message.answer(
+                "❌ Неверный формат. Скопируйте API ключ Wildberries целиком"
+            )
+            return
         
-        await message.answer("🔄 Проверяю API ключ...")
-        
-        # Создаем клиента с незашифрованным ключом для проверки
-        client = await marketplace_factory.create_client(
-            'wildberries', api_key, is_encrypted=False
-        )
-        
-        # Проверяем валидность ключа
-        async with client:
-            is_valid = await client.validate_api_key()
-            if not is_valid:
-                # Обновляем статус на api_added при неудачной попытке
-                await db.db.execute(
-                    "UPDATE users SET setup_status = 'api_added' WHERE user_id = ?",
-                    (message.from_user.id,)
-                )
-                await db.db.commit()
-                await message.answer("❌ Неверный API ключ")
-                return
+        # Проверяем валидность незашифрованного ключа, пока отправляется сообщение о проверке
+        progress, is_valid = await asyncio.gather(
+            message.answer("🔄 Проверяю API ключ..."),
+            marketplace_factory.validate_key('wildberries', api_key)
+        )
+        if not is_valid:
+            # Обновляем статус на api_added при неудачной попытке
+            await db.set_setup_status(message.from_user.id, 'api_added')
+            await progress.edit_text("❌ Неверный API ключ")
+            return
         
         # Если ключ валидный, шифруем и сохраняем
-        encrypted_key = marketplace_factory.encrypt_api_key(api_key)
-        await db.db.execute(
-            "UPDATE users SET wildberries_api_key = ? WHERE user_id = ?",
-            (encrypted_key, message.from_user.id)
-        )
-        await db.db.commit()
+        encrypted_key = await asyncio.to_thread(marketplace_factory.encrypt_api_key, api_key)
+        await db.update_api_keys(message.from_user.id, wildberries_key=encrypted_key)
         
-        await message.answer(
+        # Результат и состояние ключей показываем одним сообщением вместо трёх
+        user_data = await db.get_user(message.from_user.id)
+        await progress.edit_text(
             "✅ API ключ Wildberries успешно добавлен!\n\n"
             "Теперь вы можете:\n"
             "1️⃣ Настроить интервал проверки в разделе ⚙️ Настройки\n"
-            "2️⃣ Начать отслеживать акции в разделе 📊 Мои акции",
-            reply_markup=get_main_menu_keyboard()
+            "2️⃣ Начать отслеживать акции в разделе 📊 Мои акции\n\n"
+            + await format_api_keys_message(user_data),
+            reply_markup=get_api_key_keyboard()
         )
-        await show_api_keys_message(message, db)
         
-    except Exception as e:
-        logger.error(f"Error processing Wildberries API key: {str(e)}")
+    except Exception:
+        logger.exception(f"Error processing Wildberries API key for user {message.from_user.id}")
         # Обновляем статус на api_added при любой ошибке валидации
-        await db.db.execute(
-            "UPDATE users SET setup_status = 'api_added' WHERE user_id = ?",
-            (message.from_user.id,)
-        )
-        await db.db.commit()
+        await db.set_setup_status(message.from_user.id, 'api_added')
         await message.answer(
             "❌ Произошла ошибка при проверке API ключа\n\n"
             "Пожалуйста, убедитесь что:\n"
@@ -449,80 +359,54 @@ async def process_wb_api_key(
         )
     finally:
         await state.clear()
-
-async def show_api_keys_message(message: Message, db: Database) -> None:
-    """Show API keys for message."""
-    user_data = await db.get_user(message.from_user.id)
-    if not user_data:
-        await message.answer("❌ Вы не зарегистрированы. Используйте /start")
-        return
-
-    await message.answer(
-        await format_api_keys_message(user_data),
-        reply_markup=get_api_key_keyboard()
-    )
+        _validating_users.discard(message.from_user.id)
 
 @router.callback_query(F.data == "settings")
 async def process_settings(callback: CallbackQuery):
     """Handle settings button press."""
-    try:
-        await callback.message.edit_text(
-            "⚙️ Настройки\n\n" + "\u200b"
-            "Выберите интервал проверки акций:",
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            SETTINGS_MESSAGE,
             reply_markup=get_settings_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
-@router.callback_query(F.data.startswith("interval:"))
-async def process_interval_change(callback: CallbackQuery, db: Database):
+@router.callback_query(F.data.regexp(r"interval:(\d+)$").as_("interval_match"))
+async def process_interval_change(
+    callback: CallbackQuery,
+    db: Database,
+    interval_match: re.Match,
+    user_data: Optional[Dict]
+):
     """Handle interval change."""
-    hours = int(callback.data.split(":")[1])
-    
-    try:
-        await db.db.execute(
-            "UPDATE users SET check_interval = ? WHERE user_id = ?",
-            (hours * 3600, callback.from_user.id)
-        )
-        await db.db.commit()
-        await callback.message.edit_text(
-            f"✅ Интервал проверки обновлен: каждые {hours} {'час' if hours == 1 else 'часа' if 2 <= hours <= 4 else 'часов'}" + "\u200b",
-            reply_markup=get_main_menu_keyboard()
-        )
-    except Exception as e:
-        await callback.message.edit_text(
-            "❌ Не удалось обновить интервал проверки. Попробуйте позже." + "\u200b",
-            reply_markup=get_main_menu_keyboard()
-        )
-    
-    await callback.answer()
-
-@router.callback_query(F.data == "back_to_main")
-async def process_back_to_main(callback: CallbackQuery) -> None:
-    """Handle back to main menu."""
+    hours = int(interval_match.group(1))
+    interval_text = _CHECK_INTERVAL_TEXT.get(hours)
+    if interval_text is None:
+        await callback.answer("❌ Недопустимый интервал проверки", show_alert=True)
+        return
+    # Acknowledge the press right away, while the update is written
+    answered = asyncio.ensure_future(callback.answer())
     try:
-        await callback.message.edit_text(
-            format_start_message(True) + "\u200b",
-            reply_markup=get_start_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        try:
+            # Повторный выбор текущего интервала не требует записи в базу
+            if not user_data or user_data.get("check_interval") != hours * 3600:
+                await db.update_check_interval(callback.from_user.id, hours)
+            text = f"✅ Интервал проверки обновлен: каждые {interval_text}" + "\u200b"
+        except aiosqlite.Error:
+            logger.exception(f"Failed to update check interval for user {callback.from_user.id}")
+            text = "❌ Не удалось обновить интервал проверки. Попробуйте позже." + "\u200b"
+        
+        await edit_text_if_changed(callback.message, text, reply_markup=get_main_menu_keyboard())
+    finally:
+        await answered
 
-@router.message(Command("unsubscribe"))
-async def cmd_unsubscribe(message: Message, db: Database) -> None:
+@router.message(Command("unsubscribe"), flags={"require_registered": True})
+async def cmd_unsubscribe(message: Message) -> None:
     """Handle /unsubscribe command."""
-    user_data = await db.get_user(message.from_user.id)
-    if not user_data:
-        await message.answer("❌ Вы не зарегистрированы. Используйте /start")
-        return
-        
     await message.answer(
-        "❗️ Вы уверены, что хотите отменить подписку?\n"
-        "Это действие нельзя отменить.",
+        UNSUBSCRIBE_CONFIRM_MESSAGE,
         reply_markup=get_confirmation_keyboard()
     )
 
@@ -531,15 +415,14 @@ async def cmd_unsubscribe(message: Message, db: Database) -> None:
 async def cmd_delete_data(event: Union[Message, CallbackQuery], state: FSMContext):
     """Handle /delete_data command and delete_data button."""
     if isinstance(event, CallbackQuery):
-        await event.message.edit_text(
-            "❗️ Вы уверены, что хотите удалить все сохранённые API ключи?\n" + "\u200b"
-            "Это действие нельзя отменить.",
+        await edit_text_if_changed(
+            event.message,
+            DELETE_KEYS_CONFIRM_MESSAGE,
             reply_markup=get_confirmation_keyboard()
         )
     else:
         await event.answer(
-            "❗️ Вы уверены, что хотите удалить все сохранённые API ключи?\n" + "\u200b"
-            "Это действие нельзя отменить.",
+            DELETE_KEYS_CONFIRM_MESSAGE,
             reply_markup=get_confirmation_keyboard()
         )
     await state.set_state(UserStates.waiting_for_confirmation)
@@ -548,32 +431,26 @@ async def cmd_delete_data(event: Union[Message, CallbackQuery], state: FSMContex
 @router.callback_query(F.data == "subscribe")
 async def process_subscribe(callback: CallbackQuery) -> None:
     """Handle subscription request."""
-    try:
-        await callback.message.edit_text(
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             "💳 Выберите действие:" + "\u200b",
             reply_markup=get_subscription_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "pay_subscription")
 async def process_payment(callback: CallbackQuery, db: Database) -> None:
     """Handle payment request."""
-    try:
-        await callback.message.edit_text(
-            "💳 Выберите план подписки:\n\n"
-            "1️⃣ Месяц - 299₽\n"
-            "3️⃣ Месяца - 799₽\n"
-            "6️⃣ Месяцев - 1499₽\n"
-            "1️⃣2️⃣ Месяцев - 2699₽",
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            SUBSCRIPTION_PLANS_MESSAGE,
             reply_markup=get_subscription_plans_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "cancel_subscription")
 async def process_cancel_subscription(
@@ -581,43 +458,52 @@ async def process_cancel_subscription(
     db: Database
 ) -> None:
     """Handle subscription cancellation."""
+    answered = asyncio.ensure_future(callback.answer())
     try:
-        await db.db.execute(
-            "UPDATE users SET subscription_status = 'inactive', subscription_end_date = ? WHERE user_id = ?",
-            (datetime.now(), callback.from_user.id)
-        )
-        await db.db.commit()
-        await callback.message.edit_text("✅ Подписка успешно отменена")
-    except Exception as e:
-        await callback.message.edit_text(f"❌ Ошибка: {str(e)}")
-    await callback.answer()
+        try:
+            await db.cancel_subscription(callback.from_user.id)
+            text = "✅ Подписка успешно отменена"
+        except aiosqlite.Error:
+            logger.exception(f"Failed to cancel subscription for user {callback.from_user.id}")
+            text = "❌ Не удалось отменить подписку. Попробуйте позже."
+        await edit_text_if_changed(callback.message, text)
+    finally:
+        await answered
 
-@router.callback_query(F.data == "confirm")
+@router.callback_query(F.data == "confirm", UserStates.waiting_for_confirmation)
 async def process_confirmation(
     callback: CallbackQuery,
     state: FSMContext,
     db: Database
 ) -> None:
     """Handle confirmation of dangerous actions."""
-    current_state = await state.get_state()
-    if current_state == UserStates.waiting_for_confirmation:
-        state_data = await state.get_data()
-        action = state_data.get("action")
-        
+    state_data = await state.get_data()
+    action = state_data.get("action")
+    # The state is done with; clear it while the action is written
+    cleared = asyncio.ensure_future(state.clear())
+    answered = asyncio.ensure_future(callback.answer())
+    try:
+        text = None
         if action == "delete_keys":
             try:
-                await db.db.execute(
-                    "UPDATE users SET ozon_api_key = NULL, wildberries_api_key = NULL WHERE user_id = ?",
-                    (callback.from_user.id,)
+                await db.update_user(
+                    callback.from_user.id,
+                    ozon_api_key=None,
+                    wildberries_api_key=None
                 )
-                await db.db.commit()
-                await callback.message.edit_text(
-                    "✅ Все API ключи успешно удалены"
-                )
-            except Exception as e:
-                await callback.message.edit_text(f"❌ Ошибка: {str(e)}")
+                text = "✅ Все API ключи успешно удалены"
+            except aiosqlite.Error:
+                logger.exception(f"Failed to delete API keys for user {callback.from_user.id}")
+                text = "❌ Не удалось удалить API ключи. Попробуйте позже."
         
-        await state.clear()
+        if text:
+            await edit_text_if_changed(callback.message, text)
+    finally:
+        await asyncio.gather(cleared, answered)
+
+@router.callback_query(F.data == "confirm")
+async def process_stale_confirmation(callback: CallbackQuery) -> None:
+    """Handle confirm press on a dialog that is no longer pending."""
     await callback.answer()
 
 @router.callback_query(F.data == "cancel")
@@ -626,19 +512,16 @@ async def process_cancellation(
     state: FSMContext
 ) -> None:
     """Handle cancellation of dangerous actions."""
-    try:
-        await callback.message.edit_text("❌ Действие отменено" + "\u200b")
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await state.clear()
-    await callback.answer()
+    await asyncio.gather(
+        state.clear(),
+        edit_text_if_changed(callback.message, "❌ Действие отменено" + "\u200b"),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "my_promotions")
-async def show_promotions(callback: CallbackQuery, db: Database):
+async def show_promotions(callback: CallbackQuery, user_data: Optional[Dict]):
     """Show user's promotions."""
     # Проверяем наличие API ключей
-    user_data = await db.get_user(callback.from_user.id)
     if not user_data:
         await callback.answer("❌ Сначала добавьте API ключи", show_alert=True)
         return
@@ -670,108 +553,85 @@ async def show_promotions(callback: CallbackQuery, db: Database):
             text += f"└ Бот проверяет акции каждые {interval_hours} часа\n"
             text += "└ Вы получите уведомление при изменениях\n"
 
-    try:
-        await callback.message.edit_text(
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             text + "\u200b",
             reply_markup=get_main_menu_keyboard(),
             parse_mode="Markdown"
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    
-    await callback.answer()
-
-@router.callback_query(F.data == "settings")
-async def show_settings(callback: CallbackQuery):
-    """Show settings menu."""
-    try:
-        await callback.message.edit_text(
-            "⚙️ Настройки\n\n"
-            "Выберите параметр для настройки:",
-            reply_markup=get_settings_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "subscription")
-async def show_subscription(callback: CallbackQuery, db: Database):
+async def show_subscription(callback: CallbackQuery, user_data: Optional[Dict]):
     """Show subscription info."""
-    user_data = await db.get_user(callback.from_user.id)
     if not user_data:
         await callback.answer("❌ Пользователь не найден", show_alert=True)
         return
     
-    status_text = await format_subscription_status(user_data)
-    try:
-        await callback.message.edit_text(
+    status_text = format_subscription_status(user_data)
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             status_text + "\u200b",
             reply_markup=get_subscription_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "api_keys")
-async def show_api_keys(callback: CallbackQuery, db: Database):
+async def show_api_keys(callback: CallbackQuery, user_data: Optional[Dict]):
     """Show API keys management."""
-    user_data = await db.get_user(callback.from_user.id)
     if not user_data:
-        await callback.message.edit_text(
-            "❌ Вы не зарегистрированы. Используйте /start",
+        await edit_text_if_changed(
+            callback.message,
+            NOT_REGISTERED_MESSAGE,
             reply_markup=get_start_keyboard()
         )
         return
         
-    try:
-        await callback.message.edit_text(
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             await format_api_keys_message(user_data),
             reply_markup=get_api_key_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "check_interval")
 async def show_check_interval(callback: CallbackQuery):
     """Show check interval settings."""
-    try:
-        await callback.message.edit_text(
-            "⏰ Интервал проверки акций\n\n" + "\u200b"
-            "Выберите, как часто проверять акции:",
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            CHECK_INTERVAL_MESSAGE,
             reply_markup=get_settings_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "help")
 async def show_help(callback: CallbackQuery):
     """Show help message."""
-    help_text = format_help_message()
-    try:
-        await callback.message.edit_text(
+    help_text = await format_help_message()
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
             help_text + "\u200b",
             reply_markup=get_main_menu_keyboard()
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+        ),
+        callback.answer()
+    )
 
 @router.callback_query(F.data == "check_api_status")
 async def check_api_status(
     callback: CallbackQuery,
-    db: Database,
+    user_data: Optional[Dict],
     marketplace_factory: MarketplaceFactory
 ):
     """Handle API status check."""
-    user_data = await db.get_user(callback.from_user.id)
     if not user_data:
         await callback.answer("❌ Сначала добавьте API ключи", show_alert=True)
         return
@@ -781,33 +641,29 @@ async def check_api_status(
         await callback.answer("❌ Добавьте хотя бы один API ключ", show_alert=True)
         return
     
+    # Validation takes a request per marketplace; acknowledge the press first
+    answered = asyncio.ensure_future(callback.answer())
     try:
-        await callback.message.edit_text(
-            "🔄 Проверяю статус API ключей..." + "\u200b",
-            reply_markup=None
+        await edit_text_if_changed(
+            callback.message,
+            "🔄 Проверяю статус API ключей..." + "\u200b"
         )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    
-    # Get status message with validation
-    status_message = await format_api_keys_message(user_data, marketplace_factory, validate=True)
-    
-    try:
-        await callback.message.edit_text(
+        
+        # Get status message with validation
+        status_message = await format_api_keys_message(user_data, marketplace_factory, validate=True)
+        
+        await edit_text_if_changed(
+            callback.message,
             status_message + "\u200b",
             reply_markup=get_api_key_keyboard()
         )
-    except TelegramBadRequest as e:
-        if "message is not modified" not in str(e):
-            raise
-    await callback.answer()
+    finally:
+        await answered
 
 @router.message(Command("my_promotions"))
-async def cmd_my_promotions(message: Message, db: Database, monitor: PromotionMonitor):
+async def cmd_my_promotions(message: Message, user_data: Optional[Dict], monitor: PromotionMonitor):
     """Handle /my_promotions command."""
     # Проверяем наличие API ключей
-    user_data = await db.get_user(message.from_user.id)
     if not user_data:
         await message.answer("❌ Сначала добавьте API ключи")
         return
@@ -869,21 +725,11 @@ async def cmd_my_promotions(message: Message, db: Database, monitor: PromotionMo
 @router.callback_query(F.data == "change_api_keys")
 async def process_change_api_keys(callback: CallbackQuery, db: Database) -> None:
     """Handle change_api_keys button press."""
-    await callback.message.edit_text(
-        "🔑 Выберите маркетплейс для изменения API ключа:",
-        reply_markup=get_api_key_keyboard()
-    )
-    await callback.answer()
-
-@router.message(Command("add_api"))
-async def cmd_add_api(message: Message, db: Database) -> None:
-    """Handle /add_api command."""
-    user_data = await db.get_user(message.from_user.id)
-    if not user_data:
-        await message.answer("❌ Вы не зарегистрированы. Используйте /start")
-        return
-        
-    await message.answer(
-        "🔑 Выберите маркетплейс для добавления API ключа:",
-        reply_markup=get_api_key_keyboard()
+    await asyncio.gather(
+        edit_text_if_changed(
+            callback.message,
+            "🔑 Выберите маркетплейс для изменения API ключа:",
+            reply_markup=get_api_key_keyboard()
+        ),
+        callback.answer()
     )
@@ -3,8 +3,12 @@ Admin keyboard utilities for the PriceGuard bot.
 File: src/bot/keyboards/admin.py
 """
 
+from functools import cache
+from typing import List
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+@cache
 def get_admin_keyboard() -> InlineKeyboardMarkup:
     """Get admin panel keyboard."""
     buttons = [
@@ -41,6 +45,7 @@ def get_admin_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@cache
 def get_users_keyboard() -> InlineKeyboardMarkup:
     """Get users management keyboard."""
     buttons = [
@@ -63,18 +68,15 @@ def get_users_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
-def get_users_pagination_keyboard(current_page: int, total_pages: int) -> InlineKeyboardMarkup:
-    """Get pagination keyboard for users list."""
-    keyboard = []
-    
-    # Navigation buttons row
+def _get_pagination_row(callback_prefix: str, current_page: int, total_pages: int) -> List[InlineKeyboardButton]:
+    """Get navigation buttons row for a paginated list."""
     nav_row = []
     
     # Previous page button
     if current_page > 1:
         nav_row.append(InlineKeyboardButton(
             text="◀️",
-            callback_data=f"users_page:{current_page - 1}"
+            callback_data=f"{callback_prefix}:{current_page - 1}"
         ))
     
     # Current page indicator
@@ -87,13 +89,23 @@ def get_users_pagination_keyboard(current_page: int, total_pages: int) -> Inline
     if current_page < total_pages:
         nav_row.append(InlineKeyboardButton(
             text="▶️",
-            callback_data=f"users_page:{current_page + 1}"
+            callback_data=f"{callback_prefix}:{current_page + 1}"
         ))
     
-    keyboard.append(nav_row)
-    
+    return nav_row
+
+def get_users_pagination_keyboard(current_page: int, total_pages: int) -> InlineKeyboardMarkup:
+    """Get pagination keyboard for users list."""
+    keyboard = [_get_pagination_row("users_page", current_page, total_pages)]
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+def get_subscriptions_pagination_keyboard(current_page: int, total_pages: int) -> InlineKeyboardMarkup:
+    """Get pagination keyboard for subscriptions list."""
+    keyboard = [_get_pagination_row("subs_page", current_page, total_pages)]
+    keyboard.extend(get_subscriptions_keyboard().inline_keyboard)
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cache
 def get_subscriptions_keyboard() -> InlineKeyboardMarkup:
     """Get subscriptions management keyboard."""
     buttons = [
@@ -2,8 +2,11 @@
 Payment-related keyboards.
 """
 
+from functools import cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+@cache
 def get_subscription_keyboard() -> InlineKeyboardMarkup:
     """Get subscription management keyboard."""
     keyboard = [
@@ -28,6 +31,7 @@ def get_subscription_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cache
 def get_subscription_plans_keyboard() -> InlineKeyboardMarkup:
     """Get subscription plans keyboard."""
     keyboard = [
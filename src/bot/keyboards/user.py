@@ -3,6 +3,8 @@ Keyboard layouts for the PriceGuard bot.
 File: src/bot/keyboards/user.py
 """
 
+from functools import cache
+
 from aiogram.types import (
     InlineKeyboardMarkup,
     InlineKeyboardButton,
@@ -11,6 +13,7 @@ from aiogram.types import (
 )
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+@cache
 def get_start_keyboard() -> InlineKeyboardMarkup:
     """Get start menu keyboard."""
     keyboard = [
@@ -29,6 +32,7 @@ def get_start_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cache
 def get_settings_keyboard() -> InlineKeyboardMarkup:
     """Get keyboard for settings command."""
     builder = InlineKeyboardBuilder()
@@ -47,6 +51,7 @@ def get_settings_keyboard() -> InlineKeyboardMarkup:
     builder.adjust(2, 2, 1)  # 2 кнопки в ряд для интервалов, 1 для кнопки "Назад"
     return builder.as_markup()
 
+@cache
 def get_api_key_keyboard() -> InlineKeyboardMarkup:
     """Get API key management keyboard."""
     keyboard = [
@@ -81,6 +86,7 @@ def get_api_key_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cache
 def get_subscription_keyboard() -> InlineKeyboardMarkup:
     """Get subscription management keyboard."""
     buttons = [
@@ -105,6 +111,7 @@ def get_subscription_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@cache
 def get_confirmation_keyboard() -> InlineKeyboardMarkup:
     """Get confirmation keyboard."""
     builder = InlineKeyboardBuilder()
@@ -113,6 +120,7 @@ def get_confirmation_keyboard() -> InlineKeyboardMarkup:
     builder.adjust(2)
     return builder.as_markup()
 
+@cache
 def get_main_menu_keyboard() -> InlineKeyboardMarkup:
     """Get main menu keyboard."""
     builder = InlineKeyboardBuilder()
@@ -130,3 +138,21 @@ def get_main_menu_keyboard() -> InlineKeyboardMarkup:
     
     builder.adjust(2, 2, 1)  # 2 buttons in first two rows, 1 in last
     return builder.as_markup()
+
+@cache
+def get_help_keyboard() -> InlineKeyboardMarkup:
+    """Get help message keyboard."""
+    buttons = [
+        [InlineKeyboardButton(text="🤔 Как это работает?", callback_data="how_it_works")],
+        [InlineKeyboardButton(text="❓ Частые вопросы", callback_data="show_faq")],
+        [InlineKeyboardButton(text="👨‍💻 Тех. поддержка", url="https://t.me/plmkr78")]
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+@cache
+def get_faq_keyboard() -> InlineKeyboardMarkup:
+    """Get FAQ keyboard."""
+    buttons = [
+        [InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_help")]
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
@@ -7,7 +7,7 @@ from aiogram import Dispatcher
 from core.config import Config
 from .auth import AuthMiddleware
 from .error import ErrorMiddleware
-from .admin import AdminMiddleware
+from .throttle import ThrottleMiddleware
 
 def setup_middlewares(dp: Dispatcher, config: Config) -> None:
     """
@@ -17,14 +17,13 @@ def setup_middlewares(dp: Dispatcher, config: Config) -> None:
         dp: Dispatcher instance
         config: Bot configuration
     """
+    # Drop repeated button presses before any other middleware runs
+    dp.callback_query.outer_middleware(ThrottleMiddleware())
+
     # Add authentication middleware
     dp.message.middleware(AuthMiddleware(config.telegram.admin_user_id))
     dp.callback_query.middleware(AuthMiddleware(config.telegram.admin_user_id))
 
-    # Add admin middleware
-    dp.message.middleware(AdminMiddleware())
-    dp.callback_query.middleware(AdminMiddleware())
-
     # Add error handling middleware
     dp.message.middleware(ErrorMiddleware())
     dp.callback_query.middleware(ErrorMiddleware())
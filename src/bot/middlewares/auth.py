@@ -5,10 +5,11 @@ File: src/bot/middlewares/auth.py
 
 from typing import Any, Awaitable, Callable, Dict
 from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
 from aiogram.types import Message, CallbackQuery
 from core.database import Database
 from core.logging import get_logger
-from bot.utils.messages import SUBSCRIPTION_REQUIRED
+from bot.utils.messages import NOT_REGISTERED_MESSAGE, SUBSCRIPTION_REQUIRED
 from datetime import datetime
 
 logger = get_logger(__name__)
@@ -46,37 +47,41 @@ class AuthMiddleware(BaseMiddleware):
                 logger.error("Database instance not found in middleware data")
                 return
 
-            # Check if user exists in database
+            # Known users only need a read
             user_data = await db.get_user(user.id)
-            if not user_data:
-                # Add new user if not exists
+
+            # Handlers flagged require_registered are not reached by unknown users;
+            # they are asked to /start instead of being registered here
+            if user_data is None and get_flag(data, "require_registered"):
+                await event.answer(NOT_REGISTERED_MESSAGE)
+                return
+
+            # Add new user if not exists
+            if user_data is None:
                 try:
                     full_name = user.first_name
                     if user.last_name:
                         full_name += f" {user.last_name}"
-                        
-                    await db.add_user(
+
+                    if await db.register_user(
                         user_id=user.id,
                         username=user.username,
                         full_name=full_name
-                    )
-                    logger.info(f"New user registered: {user.id} (@{user.username})")
+                    ):
+                        logger.info(f"New user registered: {user.id} (@{user.username})")
                 except Exception as e:
                     logger.error(f"Failed to register new user {user.id}: {e}")
                     return
+                user_data = await db.get_user(user.id)
 
-            # Add user info to handler data
-            data["user"] = user_data
+            # Add user info to handler data, handlers take it as user_data
+            data["user_data"] = user_data
             data["is_admin"] = user.id == self.admin_id
 
-            # Get fresh user data if it was just created
-            if not user_data:
-                user_data = await db.get_user(user.id)
-                data["user"] = user_data
-
             # Check subscription status for non-admin users
             if not data["is_admin"]:
-                status = user_data.get("subscription_status", "inactive")
+                # A user whose row could not be read has no subscription
+                status = (user_data or {}).get("subscription_status", "inactive")
                 if status not in ["active", "trial"]:
                     # Allow only specific commands for users without active subscription
                     if isinstance(event, Message) and event.text:
@@ -0,0 +1,67 @@
+"""
+Flood control request middleware for the PriceGuard bot.
+File: src/bot/middlewares/flood.py
+"""
+
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# How many times a request is retried after Telegram asks to slow down
+FLOOD_MAX_RETRIES = 3
+
+class FloodControlMiddleware(BaseRequestMiddleware):
+    """
+    Request middleware that honours Telegram's retry_after.
+
+    A 429 does not say whether the per-chat or the bot-wide limit was hit,
+    so the whole bot is paused for the requested time: the failed request
+    is repeated afterwards and concurrent requests wait instead of hitting
+    the limit again.
+    """
+
+    def __init__(self, max_retries: int = FLOOD_MAX_RETRIES):
+        self.max_retries = max_retries
+        # Monotonic time until which all requests wait
+        self._paused_until = 0.0
+
+    async def _wait(self) -> None:
+        # Re-check after sleeping: the pause may have been extended meanwhile
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod
+    ) -> Response:
+        attempt = 0
+        while True:
+            await self._wait()
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(
+                    f"Flood limit on {type(method).__name__} "
+                    f"for chat {getattr(method, 'chat_id', None)}, "
+                    f"retrying in {e.retry_after}s"
+                )
+                self._paused_until = max(
+                    self._paused_until,
+                    time.monotonic() + e.retry_after
+                )
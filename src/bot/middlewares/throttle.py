@@ -0,0 +1,41 @@
+"""
+Throttling middleware for the PriceGuard bot.
+File: src/bot/middlewares/throttle.py
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery
+
+# Repeated presses of the same button within this many seconds are dropped
+THROTTLE_WINDOW = 0.5
+# Expired entries are purged once the table grows past this size
+THROTTLE_MAX_SIZE = 10_000
+
+class ThrottleMiddleware(BaseMiddleware):
+    """Middleware for dropping repeated presses of the same button."""
+
+    def __init__(self, window: float = THROTTLE_WINDOW):
+        self.window = window
+        # (user_id, callback data) -> time until which repeats are dropped
+        self._seen: Dict[Tuple[int, str], float] = {}
+        super().__init__()
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        now = time.monotonic()
+        key = (event.from_user.id, event.data or "")
+        if self._seen.get(key, 0) > now:
+            # Убираем индикатор загрузки на кнопке, но не запускаем обработчик
+            await event.answer()
+            return
+
+        if len(self._seen) >= THROTTLE_MAX_SIZE:
+            self._seen = {k: until for k, until in self._seen.items() if until > now}
+        self._seen[key] = now + self.window
+        return await handler(event, data)
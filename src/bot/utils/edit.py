@@ -0,0 +1,55 @@
+"""
+Message editing helpers for the PriceGuard bot.
+File: src/bot/utils/edit.py
+"""
+
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message, InlineKeyboardMarkup
+
+def _current_text(message: Message, parse_mode: Optional[str]) -> Optional[str]:
+    """Return message text in the same markup the new text is written in."""
+    if message.text is None:
+        return None
+    if parse_mode == "HTML":
+        return message.html_text
+    if parse_mode in ("Markdown", "MarkdownV2"):
+        return message.md_text
+    return message.text
+
+async def edit_text_if_changed(
+    message: Message,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    parse_mode: Optional[str] = None
+) -> bool:
+    """
+    Edit message text unless it already shows the same content.
+
+    The callback's message carries its current text and keyboard, so a
+    repeated button press can be detected without a request to Telegram.
+
+    Args:
+        message: Message to edit
+        text: New message text
+        reply_markup: New inline keyboard
+        parse_mode: Parse mode of the new text
+
+    Returns:
+        bool: True if the message was edited
+    """
+    # Telegram trims surrounding whitespace from message text
+    if (
+        _current_text(message, parse_mode) == text.strip()
+        and message.reply_markup == reply_markup
+    ):
+        return False
+
+    try:
+        await message.edit_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+        return False
+    return True
@@ -47,6 +47,23 @@ WILDBERRIES_API_KEY_INSTRUCTION = """
 ❗️ Важно: Отправляйте только сам токен, без дополнительных символов
 """
 
+# Краткая инструкция для напоминаний (HTML)
+API_INSTRUCTIONS_MESSAGE = (
+    "📝 <b>Как получить API ключи</b>\n\n"
+    "<b>OZON</b>\n"
+    "1. Войдите в личный кабинет продавца\n"
+    "2. Перейдите в раздел Настройки → API\n"
+    "3. Создайте новый ключ с ролью Admin Read Only\n"
+    "4. Скопируйте Client Id и Api Key\n"
+    "5. Отправьте боту в формате: Client_id:Api_key\n\n"
+    "<b>Wildberries</b>\n"
+    "1. Войдите в личный кабинет продавца\n"
+    "2. Перейдите в раздел Настройки → Доступ к API\n"
+    "3. Создайте новый ключ с разрешением на Цены и скидки\n"
+    "4. Скопируйте и отправьте ключ боту\n\n"
+    "Используйте команду /add_api для добавления ключей"
+)
+
 # Trial expiration messages
 TRIAL_EXPIRING_SOON = """
 ⚠️ Ваш пробный период скоро закончится!
@@ -129,106 +146,159 @@ MENU_MESSAGE = """
 Выберите нужное действие:
 """
 
+NOT_REGISTERED_MESSAGE = "❌ Вы не зарегистрированы. Используйте /start"
+
+SETTINGS_MESSAGE = "⚙️ Настройки\n\n\u200bВыберите интервал проверки акций:"
+
+CHECK_INTERVAL_MESSAGE = "⏰ Интервал проверки акций\n\n\u200bВыберите, как часто проверять акции:"
+
+DELETE_KEYS_CONFIRM_MESSAGE = (
+    "❗️ Вы уверены, что хотите удалить все сохранённые API ключи?\n\u200b"
+    "Это действие нельзя отменить."
+)
+
+UNSUBSCRIBE_CONFIRM_MESSAGE = (
+    "❗️ Вы уверены, что хотите отменить подписку?\n"
+    "Это действие нельзя отменить."
+)
+
+SUBSCRIPTION_PLANS_MESSAGE = (
+    "💳 Выберите план подписки:\n\n"
+    "1️⃣ Месяц - 299₽\n"
+    "3️⃣ Месяца - 799₽\n"
+    "6️⃣ Месяцев - 1499₽\n"
+    "1️⃣2️⃣ Месяцев - 2699₽"
+)
+
+FAQ_MESSAGE = (
+    "❓ <b>Частые вопросы (FAQ)</b>\n\n"
+    "<b>🔑 API ключи и настройка:</b>\n"
+    "▫️ <b>Где взять API ключ Ozon?</b>\n"
+    "   Получить API ключ можно в личном кабинете Ozon → Профиль → Настройки → API ключи.\n\n"
+    "▫️ <b>Где взять API ключ Wildberries?</b>\n"
+    "   API ключ доступен в личном кабинете WB → Профиль → Доступ к API.\n\n"
+    "▫️ <b>Что делать если API ключ не работает?</b>\n"
+    "   Проверьте правильность ввода и убедитесь, что ключ активен в личном кабинете маркетплейса.\n\n"
+    "<b>📊 Мониторинг акций:</b>\n"
+    "▫️ <b>Как часто обновляется информация?</b>\n"
+    "   Проверка акций происходит каждые 4 часа, но вы можете изменить интервал в разделе /settings.\n\n"
+    "▫️ <b>Почему я не получаю уведомления?</b>\n"
+    "   Убедитесь, что бот не заблокирован и подписка активна.\n\n"
+    "▫️ <b>Какие типы акций отслеживаются?</b>\n"
+    "   Отслеживаются все типы автоакций.\n\n"
+    "<b>💳 Подписка и оплата:</b>\n"
+    "▫️ <b>Какие есть тарифы?</b>\n"
+    "   Используйте команду /status для просмотра доступных тарифов.\n\n"
+    "▫️ <b>Как продлить подписку?</b>\n"
+    "   Перейдите в /status для управления подпиской.\n\n"
+    "<b>🔒 Безопасность:</b>\n"
+    "▫️ <b>Как защищены мои API ключи?</b>\n"
+    "   Ключи хранятся в зашифрованном виде и используются только для проверки акций.\n\n"
+    "▫️ <b>Кто имеет доступ к моим данным?</b>\n"
+    "   Доступ к данным есть только у вас через ваш Telegram аккаунт.\n\n"
+    "<b>🤖 Использование бота:</b>\n"
+    "▫️ <b>Что делать если бот не отвечает?</b>\n"
+    "   Перезапустите бота командой /start или обратитесь в поддержку.\n\n"
+    "▫️ <b>Как удалить свои данные?</b>\n"
+    "   Используйте команду /delete_data для полного удаления данных."
+)
+
+WELCOME_BACK_MESSAGE = (
+    "👋 С возвращением в PriceGuard!\n\n"
+    "PriceGuard - ваш надежный помощник для отслеживания акций на Ozon и Wildberries. "
+    "Бот автоматически мониторит акции маркетплейсов и сообщит вам, если ваш товар попал в акцию.\n\n"
+    "Выберите действие из меню ниже:"
+)
+
+NEW_USER_START_MESSAGE = (
+    START_MESSAGE + "\n\n" +
+    HOW_IT_WORKS_MESSAGE + "\n\n" +
+    START_SETUP_MESSAGE
+)
+
+HELP_MESSAGE = (
+    "🤖 <b>PriceGuard Bot</b> - ваш помощник в мониторинге цен\n\n"
+    "<b>📱 Основные команды:</b>\n"
+    "▫️ /start - Запустить бота\n"
+    "▫️ /help - Показать эту справку\n"
+    "▫️ /settings - Настройки бота\n"
+    "▫️ /status - Подписка и тариф\n"
+    "▫️ /add_api - Добавить API ключи\n"
+    "▫️ /delete_data - Удалить все API ключи\n"
+)
+
+# Statuses without dates render the same text every time
+_SUBSCRIPTION_STATUS_TEXT = {
+    'trial': "📊 Статус подписки\n\nСтатус: 🎁 Пробный период\n",
+    'inactive': "📊 Статус подписки\n\nСтатус: ❌ Неактивна\n",
+}
+
 def format_start_message(is_registered: bool = False) -> str:
     """Format start command message."""
-    if is_registered:
-        return (
-            "👋 С возвращением в PriceGuard!\n\n"
-            "PriceGuard - ваш надежный помощник для отслеживания акций на Ozon и Wildberries. "
-            "Бот автоматически мониторит акции маркетплейсов и сообщит вам, если ваш товар попал в акцию.\n\n"
-            "Выберите действие из меню ниже:"
-        )
-    else:
-        return (
-            START_MESSAGE + "\n\n" +
-            HOW_IT_WORKS_MESSAGE + "\n\n" +
-            START_SETUP_MESSAGE
-        )
+    return WELCOME_BACK_MESSAGE if is_registered else NEW_USER_START_MESSAGE
 
 async def format_help_message(user_data: Optional[Dict] = None, marketplace_factory: Optional[MarketplaceFactory] = None) -> str:
     """Format help command message with context-aware hints."""
-    base_message = (
-        "🤖 <b>PriceGuard Bot</b> - ваш помощник в мониторинге цен\n\n"
-        "<b>📱 Основные команды:</b>\n"
-        "▫️ /start - Запустить бота\n"
-        "▫️ /help - Показать эту справку\n"
-        "▫️ /settings - Настройки бота\n"
-        "▫️ /status - Подписка и тариф\n"
-        "▫️ /add_api - Добавить API ключи\n"
-        "▫️ /delete_data - Удалить все API ключи\n"
-    )
+    if not user_data:
+        return HELP_MESSAGE
 
     # Добавляем контекстные подсказки
     hints = []
-    if user_data:
-        # Если нет API ключей
-        if not user_data.get('ozon_api_key') and not user_data.get('wb_api_key'):
-            hints.append("💡 <b>Подсказка:</b> Добавьте API ключи через команду /add_api, чтобы начать мониторинг")
-        
-        # Если ключи не прошли валидацию
-        elif marketplace_factory:
-            validation = await validate_marketplace_keys(user_data, marketplace_factory)
-            if not validation['ozon'] and user_data.get('ozon_api_key'):
-                hints.append("⚠️ <b>Внимание:</b> API ключ Ozon недействителен. Убедитесь, что при создании ключа вы установили роль Admin Read Only, и что указали его боту в формате Client_id:Api_key")
-            if not validation['wildberries'] and user_data.get('wb_api_key'):
-                hints.append("⚠️ <b>Внимание:</b> API ключ Wildberries недействителен. Убедитесь, что при создании ключа вы указали разрешение на Цены и скидки.")
-        
-        # Если есть ключи, но нет активной подписки
-        elif not user_data.get('is_subscribed'):
-            hints.append("💡 <b>Подсказка:</b> Оформите подписку в разделе /status, чтобы активировать мониторинг")
-        
-        # Если большой интервал проверки
-        elif user_data.get('check_interval', 240) > 240:  # больше 4 часов
-            hints.append("💡 <b>Подсказка:</b> Вы можете уменьшить интервал проверки акций в настройках /settings")
-        
-        # Если давно не было обновлений
-        elif user_data.get('last_check'):
-            last_check = datetime.fromisoformat(user_data['last_check'])
-            if (datetime.now() - last_check).days > 7:
-                hints.append("⚠️ <b>Внимание:</b> Бот давно не проверял акции. Проверьте работу API ключей в настройках")
+    # Если нет API ключей
+    if not user_data.get('ozon_api_key') and not user_data.get('wb_api_key'):
+        hints.append("💡 <b>Подсказка:</b> Добавьте API ключи через команду /add_api, чтобы начать мониторинг")
+    
+    # Если ключи не прошли валидацию
+    elif marketplace_factory:
+        validation = await validate_marketplace_keys(user_data, marketplace_factory)
+        if not validation['ozon'] and user_data.get('ozon_api_key'):
+            hints.append("⚠️ <b>Внимание:</b> API ключ Ozon недействителен. Убедитесь, что при создании ключа вы установили роль Admin Read Only, и что указали его боту в формате Client_id:Api_key")
+        if not validation['wildberries'] and user_data.get('wb_api_key'):
+            hints.append("⚠️ <b>Внимание:</b> API ключ Wildberries недействителен. Убедитесь, что при создании ключа вы указали разрешение на Цены и скидки.")
+    
+    # Если есть ключи, но нет активной подписки
+    elif not user_data.get('is_subscribed'):
+        hints.append("💡 <b>Подсказка:</b> Оформите подписку в разделе /status, чтобы активировать мониторинг")
+    
+    # Если большой интервал проверки
+    elif user_data.get('check_interval', 240) > 240:  # больше 4 часов
+        hints.append("💡 <b>Подсказка:</b> Вы можете уменьшить интервал проверки акций в настройках /settings")
+    
+    # Если давно не было обновлений
+    elif user_data.get('last_check'):
+        last_check = datetime.fromisoformat(user_data['last_check'])
+        if (datetime.now() - last_check).days > 7:
+            hints.append("⚠️ <b>Внимание:</b> Бот давно не проверял акции. Проверьте работу API ключей в настройках")
 
     if hints:
-        base_message += "\n\n" + "\n".join(hints)
+        return HELP_MESSAGE + "\n\n" + "\n".join(hints)
 
-    return base_message
+    return HELP_MESSAGE
 
-async def format_subscription_status(user_data: Dict) -> str:
+def format_subscription_status(user_data: Dict) -> str:
     """Format subscription status message."""
     subscription_status = user_data.get('subscription_status', 'inactive')
     subscription_end_date = user_data.get('subscription_end_date')
     created_at = user_data.get('created_at')
     
-    if subscription_status == 'active' and subscription_end_date:
-        status = "✅ Активна"
-        try:
-            end_date = datetime.fromisoformat(subscription_end_date)
-            created = datetime.fromisoformat(created_at)
-            days_left = (end_date - datetime.now()).days
-            
-            created_text = f"Дата активации: {created.strftime('%d.%m.%Y %H:%M')}\n"
-            expires_text = f"Действует до: {end_date.strftime('%d.%m.%Y %H:%M')}\n"
-            days_text = f"Осталось дней: {days_left}"
-        except (ValueError, TypeError):
-            created_text = ""
-            expires_text = ""
-            days_text = ""
-    elif subscription_status == 'trial':
-        status = "🎁 Пробный период"
-        created_text = ""
-        expires_text = ""
-        days_text = ""
-    else:
-        status = "❌ Неактивна"
-        created_text = ""
-        expires_text = ""
-        days_text = ""
+    if not (subscription_status == 'active' and subscription_end_date):
+        return _SUBSCRIPTION_STATUS_TEXT.get(
+            subscription_status, _SUBSCRIPTION_STATUS_TEXT['inactive']
+        )
+
+    try:
+        end_date = datetime.fromisoformat(subscription_end_date)
+        created = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError):
+        return "📊 Статус подписки\n\nСтатус: ✅ Активна\n"
+    days_left = (end_date - datetime.now()).days
     
     return (
         f"📊 Статус подписки\n\n"
-        f"Статус: {status}\n"
-        f"{created_text}"
-        f"{expires_text}"
-        f"{days_text}"
+        f"Статус: ✅ Активна\n"
+        f"Дата активации: {created.strftime('%d.%m.%Y %H:%M')}\n"
+        f"Действует до: {end_date.strftime('%d.%m.%Y %H:%M')}\n"
+        f"Осталось дней: {days_left}"
     )
 
 def format_promo_update(
@@ -329,6 +399,13 @@ def format_user_info(user: Dict) -> str:
         f"└ Интервал проверки: {interval_min} мин"
     )
 
+def format_users_list(users_data: Dict) -> str:
+    """Format users list message for a page returned by Database.get_all_users."""
+    parts = ["👥 Список пользователей:\n\n"]
+    parts.append("\n\n".join(format_user_info(user) for user in users_data["users"]))
+    parts.append(f"\n\nВсего пользователей: {users_data['total_users']}")
+    return "".join(parts)
+
 def format_subscription_info(sub: Dict) -> str:
     """Format subscription info message."""
     status = "✅ Активна" if sub.get("is_active") else "❌ Неактивна"
@@ -360,6 +437,13 @@ def format_subscription_info(sub: Dict) -> str:
         f"`Окончание:` {end_date}"
     )
 
+def format_subscriptions_list(subscriptions_data: Dict) -> str:
+    """Format subscriptions list message for a page returned by Database.get_subscriptions_page."""
+    parts = ["💳 Список подписок:\n\n"]
+    parts.extend(format_subscription_info(sub) + "\n" for sub in subscriptions_data["subscriptions"])
+    parts.append(f"\nВсего подписок: {subscriptions_data['total_subscriptions']}")
+    return "".join(parts)
+
 def format_payment_info(payment: Dict) -> str:
     """Format payment info message."""
     status_map = {
@@ -442,35 +526,4 @@ async def format_api_keys_message(user_data: Dict, marketplace_factory: Optional
 
 def format_faq_message() -> str:
     """Format FAQ message."""
-    return (
-        "❓ <b>Частые вопросы (FAQ)</b>\n\n"
-        "<b>🔑 API ключи и настройка:</b>\n"
-        "▫️ <b>Где взять API ключ Ozon?</b>\n"
-        "   Получить API ключ можно в личном кабинете Ozon → Профиль → Настройки → API ключи.\n\n"
-        "▫️ <b>Где взять API ключ Wildberries?</b>\n"
-        "   API ключ доступен в личном кабинете WB → Профиль → Доступ к API.\n\n"
-        "▫️ <b>Что делать если API ключ не работает?</b>\n"
-        "   Проверьте правильность ввода и убедитесь, что ключ активен в личном кабинете маркетплейса.\n\n"
-        "<b>📊 Мониторинг акций:</b>\n"
-        "▫️ <b>Как часто обновляется информация?</b>\n"
-        "   Проверка акций происходит каждые 4 часа, но вы можете изменить интервал в разделе /settings.\n\n"
-        "▫️ <b>Почему я не получаю уведомления?</b>\n"
-        "   Убедитесь, что бот не заблокирован и подписка активна.\n\n"
-        "▫️ <b>Какие типы акций отслеживаются?</b>\n"
-        "   Отслеживаются все типы автоакций.\n\n"
-        "<b>💳 Подписка и оплата:</b>\n"
-        "▫️ <b>Какие есть тарифы?</b>\n"
-        "   Используйте команду /status для просмотра доступных тарифов.\n\n"
-        "▫️ <b>Как продлить подписку?</b>\n"
-        "   Перейдите в /status для управления подпиской.\n\n"
-        "<b>🔒 Безопасность:</b>\n"
-        "▫️ <b>Как защищены мои API ключи?</b>\n"
-        "   Ключи хранятся в зашифрованном виде и используются только для проверки акций.\n\n"
-        "▫️ <b>Кто имеет доступ к моим данным?</b>\n"
-        "   Доступ к данным есть только у вас через ваш Telegram аккаунт.\n\n"
-        "<b>🤖 Использование бота:</b>\n"
-        "▫️ <b>Что делать если бот не отвечает?</b>\n"
-        "   Перезапустите бота командой /start или обратитесь в поддержку.\n\n"
-        "▫️ <b>Как удалить свои данные?</b>\n"
-        "   Используйте команду /delete_data для полного удаления данных."
-    )
+    return FAQ_MESSAGE
@@ -3,8 +3,10 @@ Database management and models for the PriceGuard bot.
 File: src/core/database.py
 """
 
+import asyncio
+import time
 import aiosqlite
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from datetime import datetime, timedelta
 import json
 from core.logging import get_logger
@@ -78,17 +80,89 @@ MIGRATIONS = [
     "ALTER TABLE users ADD COLUMN ozon_client_id TEXT"
 ]
 
+# Queries run on hot paths are kept as constants so sqlite3's statement
+# cache (keyed by SQL text) reuses the prepared statement between calls
+INACTIVE_SUBSCRIPTIONS_QUERY = """
+    SELECT u.user_id, s.payment_id, s.start_date, s.end_date, u.check_interval
+    FROM subscriptions s
+    JOIN users u ON s.user_id = u.user_id
+    WHERE u.subscription_status = 'inactive'
+    OR s.end_date <= CURRENT_TIMESTAMP
+"""
+
+INSERT_PAYMENT_QUERY = (
+    "INSERT INTO payments (id, user_id, amount, status, months, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+INSERT_SUBSCRIPTION_QUERY = (
+    "INSERT INTO subscriptions "
+    "(user_id, payment_id, start_date, end_date, is_active) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+UPDATE_OZON_CREDENTIALS_QUERY = (
+    "UPDATE users SET ozon_api_key = ?, ozon_client_id = ? WHERE user_id = ?"
+)
+
+# Maximum number of queued writes committed in one transaction
+WRITE_BATCH_SIZE = 100
+
+# get_user results are kept in memory for this many seconds
+USER_CACHE_TTL = 30
+USER_CACHE_MAX_SIZE = 10_000
+
+def _isoformat(value: Any) -> Any:
+    """Store datetimes as ISO strings, pass anything else through."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _payment_params(payment_data: Dict) -> tuple:
+    """Build INSERT_PAYMENT_QUERY parameters."""
+    return (
+        payment_data["id"],
+        payment_data["user_id"],
+        payment_data["amount"],
+        payment_data["status"],
+        payment_data["months"],
+        _isoformat(payment_data["created_at"])
+    )
+
+def _subscription_params(subscription_data: Dict) -> tuple:
+    """Build INSERT_SUBSCRIPTION_QUERY parameters."""
+    return (
+        subscription_data["user_id"],
+        subscription_data["payment_id"],
+        _isoformat(subscription_data["start_date"]),
+        _isoformat(subscription_data["end_date"]),
+        subscription_data["is_active"]
+    )
+
 class Database:
     def __init__(self, database_path: str):
         logger.debug(f"Database __init__ with path: {database_path}")
         self.database_path = database_path
         self.db: Optional[aiosqlite.Connection] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        # user_id -> (expiry time, user row)
+        self._user_cache: Dict[int, Tuple[float, Dict]] = {}
+        # Bumped on every invalidation so in-flight reads don't cache stale rows
+        self._user_cache_generation = 0
+        # Reads share the writer's connection and may see uncommitted rows
+        # while a batch is open, so they are not cached then. A separate read
+        # connection would avoid this but cannot share a :memory: database
+        self._write_batch_open = False
 
     async def init(self):
         """Initialize database connection and create tables."""
         logger.debug(f"Database init with path: {self.database_path}")
         self.db = await aiosqlite.connect(self.database_path)
         await self.db.execute("PRAGMA foreign_keys = ON")
+        await self.db.execute("PRAGMA cache_size = -65536")
+        # WAL lets readers proceed while a write is in progress
+        await self.db.execute("PRAGMA journal_mode = WAL")
+        await self.db.execute("PRAGMA synchronous = NORMAL")
+        await self.db.execute("PRAGMA mmap_size = 268435456")
         
         for table_query in CREATE_TABLES:
             await self.db.execute(table_query)
@@ -103,12 +177,118 @@ class Database:
                 
         await self.db.commit()
 
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._writer_task.add_done_callback(self._on_writer_done)
+
     async def close(self):
         """Close database connection."""
+        if self._writer_task:
+            # Let queued writes finish before stopping the writer
+            if not self._writer_task.done():
+                await self._write_queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                # Already logged by _on_writer_done
+                pass
+            self._writer_task = None
         if self.db:
             await self.db.close()
             self.db = None
 
+    async def execute_write(self, *statements: Tuple[str, Sequence[Any]]) -> int:
+        """
+        Queue write statements for the writer task and wait until they are committed.
+        
+        Statements passed in one call are applied atomically. Writes queued by
+        concurrent callers are committed together in a single transaction.
+        
+        Args:
+            statements: (query, params) pairs to execute
+            
+        Returns:
+            int: Number of rows changed by the last statement
+        """
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+        if self._writer_task is None or self._writer_task.done():
+            raise RuntimeError("Database writer is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((statements, future))
+        return await future
+
+    async def _writer_loop(self) -> None:
+        """Apply queued writes, committing each batch once."""
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+
+            applied = []
+            self._write_batch_open = True
+            try:
+                if not self.db.in_transaction:
+                    await self.db.execute("BEGIN")
+                for statements, future in batch:
+                    # A savepoint per caller keeps one failed write from undoing the others
+                    await self.db.execute("SAVEPOINT write")
+                    try:
+                        rowcount = 0
+                        for query, params in statements:
+                            logger.debug(f"Database execute with query: {query}, params: {params}")
+                            cursor = await self.db.execute(query, params)
+                            rowcount = cursor.rowcount
+                        await self.db.execute("RELEASE write")
+                        applied.append((future, rowcount))
+                    except Exception as e:
+                        await self.db.execute("ROLLBACK TO write")
+                        await self.db.execute("RELEASE write")
+                        if not future.done():
+                            future.set_exception(e)
+                await self.db.commit()
+            except Exception as e:
+                logger.error(f"Database write batch failed: {str(e)}")
+                try:
+                    await self.db.rollback()
+                except Exception as rollback_error:
+                    logger.error(f"Database write batch rollback failed: {str(rollback_error)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future, rowcount in applied:
+                    if not future.done():
+                        future.set_result(rowcount)
+            finally:
+                # Reads that overlapped the batch may hold rolled back rows
+                self._write_batch_open = False
+                self._user_cache_generation += 1
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def _on_writer_done(self, task: asyncio.Task) -> None:
+        """Fail writes still queued if the writer task stops."""
+        if task.cancelled():
+            error = RuntimeError("Database writer stopped")
+        else:
+            error = task.exception() or RuntimeError("Database writer stopped")
+            logger.error(f"Database writer task exited: {str(error)}")
+        while not self._write_queue.empty():
+            _, future = self._write_queue.get_nowait()
+            if not future.done():
+                future.set_exception(error)
+            self._write_queue.task_done()
+
+    def _invalidate_user(self, user_id: int) -> None:
+        """Drop cached get_user result after the user's row changed."""
+        self._user_cache_generation += 1
+        self._user_cache.pop(user_id, None)
+
     async def fetch_all(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """Execute query and return all results as list of dictionaries."""
         logger.debug(f"Database fetch_all with query: {query}, params: {params}")
@@ -131,7 +311,7 @@ class Database:
         # Calculate trial end date
         trial_end = datetime.now() + timedelta(days=14)  # 14 days trial
         
-        async with self.db.execute(
+        await self.execute_write((
             """
             INSERT INTO users (
                 user_id, username, full_name, email, 
@@ -139,9 +319,40 @@ class Database:
             ) VALUES (?, ?, ?, ?, 'trial', ?, CURRENT_TIMESTAMP)
             """,
             (user_id, username, full_name, email, trial_end.isoformat())
-        ):
-            await self.db.commit()
-            return True
+        ))
+        self._invalidate_user(user_id)
+        return True
+
+    async def register_user(
+        self,
+        user_id: int,
+        username: Optional[str] = None,
+        full_name: Optional[str] = None
+    ) -> bool:
+        """
+        Add user unless already registered.
+        
+        Returns:
+            bool: True if the user was added by this call
+        """
+        cached = self._user_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return False
+
+        trial_end = datetime.now() + timedelta(days=14)  # 14 days trial
+        inserted = await self.execute_write((
+            """
+            INSERT INTO users (
+                user_id, username, full_name,
+                subscription_status, subscription_end_date, created_at
+            ) VALUES (?, ?, ?, 'trial', ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_id) DO NOTHING
+            """,
+            (user_id, username, full_name, trial_end.isoformat())
+        ))
+        if inserted:
+            self._invalidate_user(user_id)
+        return bool(inserted)
 
     async def update_api_keys(self, user_id: int, ozon_key: Optional[str] = None, 
                             wildberries_key: Optional[str] = None) -> bool:
@@ -164,14 +375,20 @@ class Database:
         params.append(user_id)
         query = f"UPDATE users SET {', '.join(update_fields)} WHERE user_id = ?"
         
-        try:
-            logger.debug(f"Database execute with query: {query}, params: {params}")
-            await self.db.execute(query, params)
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        await self.execute_write((query, params))
+        self._invalidate_user(user_id)
+        return True
+
+    async def update_ozon_credentials(self, user_id: int, api_key: str, client_id: str) -> bool:
+        """Update Ozon API key and client ID for user."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+
+        updated = await self.execute_write(
+            (UPDATE_OZON_CREDENTIALS_QUERY, (api_key, client_id, user_id))
+        )
+        self._invalidate_user(user_id)
+        return bool(updated)
 
     async def update_subscription(self, user_id: int, status: str, 
                                 end_date: datetime) -> bool:
@@ -179,20 +396,16 @@ class Database:
         if not self.db:
             raise RuntimeError("Database not initialized")
         
-        try:
-            await self.db.execute(
-                """
-                UPDATE users 
-                SET subscription_status = ?, subscription_end_date = ?
-                WHERE user_id = ?
-                """,
-                (status, end_date.isoformat(), user_id)
-            )
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        await self.execute_write((
+            """
+            UPDATE users 
+            SET subscription_status = ?, subscription_end_date = ?
+            WHERE user_id = ?
+            """,
+            (status, end_date.isoformat(), user_id)
+        ))
+        self._invalidate_user(user_id)
+        return True
 
     async def update_user(self, user_id: int, **kwargs) -> bool:
         """Update user information."""
@@ -211,17 +424,28 @@ class Database:
         params.append(user_id)
         query = f"UPDATE users SET {', '.join(update_fields)} WHERE user_id = ?"
         
-        try:
-            logger.debug(f"Database execute with query: {query}, params: {params}")
-            await self.db.execute(query, params)
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        await self.execute_write((query, params))
+        self._invalidate_user(user_id)
+        return True
+
+    async def set_setup_status(self, user_id: int, status: str) -> None:
+        """Update user onboarding status ('started', 'api_added' or 'api_validated')."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+        
+        await self.execute_write((
+            "UPDATE users SET setup_status = ? WHERE user_id = ?",
+            (status, user_id)
+        ))
+        self._invalidate_user(user_id)
 
     async def get_user(self, user_id: int) -> Optional[Dict]:
         """Get user information."""
+        cached = self._user_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return dict(cached[1])
+        generation = self._user_cache_generation
+
         if not self.db:
             raise RuntimeError("Database not initialized")
 
@@ -234,7 +458,13 @@ class Database:
                 return None
             
             columns = [description[0] for description in cursor.description]
-            return dict(zip(columns, row))
+            user = dict(zip(columns, row))
+
+        if generation == self._user_cache_generation and not self._write_batch_open:
+            if len(self._user_cache) >= USER_CACHE_MAX_SIZE:
+                self._user_cache.clear()
+            self._user_cache[user_id] = (time.monotonic() + USER_CACHE_TTL, user)
+        return dict(user)
 
     async def get_all_users(self, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
         """Get all users from database with pagination."""
@@ -297,51 +527,41 @@ class Database:
             "per_page": per_page
         }
 
+    async def get_all_user_ids(self) -> List[int]:
+        """Get IDs of all registered users."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+
+        async with self.db.execute("SELECT user_id FROM users") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
     async def update_promo_check(self, user_id: int, marketplace: str,
                                base_count: int, current_count: int) -> bool:
         """Update or create promo check record."""
         if not self.db:
             raise RuntimeError("Database not initialized")
         
-        try:
-            await self.db.execute(
-                """
-                INSERT INTO promo_checks (user_id, marketplace, base_count, last_checked_count)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT (user_id, marketplace) DO UPDATE SET
-                    last_checked_count = ?,
-                    last_checked_at = CURRENT_TIMESTAMP
-                """,
-                (user_id, marketplace, base_count, current_count, current_count)
-            )
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        await self.execute_write((
+            """
+            INSERT INTO promo_checks (user_id, marketplace, base_count, last_checked_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, marketplace) DO UPDATE SET
+                last_checked_count = ?,
+                last_checked_at = CURRENT_TIMESTAMP
+            """,
+            (user_id, marketplace, base_count, current_count, current_count)
+        ))
+        return True
 
     async def create_payment(self, payment_data: Dict) -> None:
         """Create payment record."""
-        await self.db.execute(
-            "INSERT INTO payments (id, user_id, amount, status, months, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (
-                payment_data["id"],
-                payment_data["user_id"],
-                payment_data["amount"],
-                payment_data["status"],
-                payment_data["months"],
-                payment_data["created_at"]
-            )
-        )
-        await self.db.commit()
+        await self.execute_write((INSERT_PAYMENT_QUERY, _payment_params(payment_data)))
 
     async def update_payment(self, payment_id: str, payment_data: Dict) -> None:
         """Update payment record."""
         set_clause = ", ".join(f"{k} = ?" for k in payment_data.keys())
         query = f"UPDATE payments SET {set_clause} WHERE id = ?"
-        await self.db.execute(query, (*payment_data.values(), payment_id))
-        await self.db.commit()
+        await self.execute_write((query, (*payment_data.values(), payment_id)))
 
     async def get_payment(self, payment_id: str) -> Optional[Dict]:
         """Get payment by ID."""
@@ -358,19 +578,61 @@ class Database:
 
     async def create_subscription(self, subscription_data: Dict) -> None:
         """Create subscription record."""
-        await self.db.execute(
-            "INSERT INTO subscriptions "
-            "(user_id, payment_id, start_date, end_date, is_active) "
-            "VALUES (?, ?, ?, ?, ?)",
+        await self.execute_write(
+            (INSERT_SUBSCRIPTION_QUERY, _subscription_params(subscription_data))
+        )
+        self._invalidate_user(subscription_data["user_id"])
+
+    async def cancel_subscription(self, user_id: int) -> None:
+        """Deactivate user's subscriptions and mark the user inactive in one transaction."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+        
+        now = datetime.now().isoformat()
+        await self.execute_write(
             (
-                subscription_data["user_id"],
-                subscription_data["payment_id"],
-                subscription_data["start_date"],
-                subscription_data["end_date"],
-                subscription_data["is_active"]
+                "UPDATE subscriptions SET is_active = 0, end_date = ? "
+                "WHERE user_id = ? AND is_active = 1",
+                (now, user_id)
+            ),
+            (
+                "UPDATE users SET subscription_status = 'inactive', subscription_end_date = ? "
+                "WHERE user_id = ?",
+                (now, user_id)
             )
         )
-        await self.db.commit()
+        self._invalidate_user(user_id)
+
+    async def activate_subscription(self, payment_data: Dict, subscription_data: Dict) -> Dict:
+        """
+        Record a completed payment, create its subscription and mark the user
+        as active in one transaction.
+        
+        Args:
+            payment_data: Payment record, as for create_payment
+            subscription_data: Subscription record, as for create_subscription
+            
+        Returns:
+            Dict: The created subscription with ISO-formatted dates
+        """
+        subscription = dict(subscription_data)
+        subscription["start_date"] = _isoformat(subscription["start_date"])
+        subscription["end_date"] = _isoformat(subscription["end_date"])
+        
+        await self.execute_write(
+            (INSERT_PAYMENT_QUERY, _payment_params(payment_data)),
+            (INSERT_SUBSCRIPTION_QUERY, _subscription_params(subscription)),
+            (
+                """
+                UPDATE users 
+                SET subscription_status = 'active', subscription_end_date = ?
+                WHERE user_id = ?
+                """,
+                (subscription["end_date"], subscription["user_id"])
+            )
+        )
+        self._invalidate_user(subscription["user_id"])
+        return subscription
 
     async def get_subscription(self, user_id: int) -> Optional[Dict]:
         """Get active subscription for user."""
@@ -407,6 +669,34 @@ class Database:
             columns = [description[0] for description in cursor.description]
             return [dict(zip(columns, row)) for row in rows]
 
+    async def get_subscriptions_page(self, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+        """Get subscriptions from database with pagination."""
+        if not self.db:
+            raise RuntimeError("Database not initialized")
+
+        async with self.db.execute("SELECT COUNT(*) FROM subscriptions") as cursor:
+            total_subscriptions = (await cursor.fetchone())[0]
+
+        total_pages = (total_subscriptions + per_page - 1) // per_page
+        page = max(1, min(page, total_pages))
+        offset = (page - 1) * per_page
+
+        async with self.db.execute(
+            "SELECT * FROM subscriptions ORDER BY start_date DESC LIMIT ? OFFSET ?",
+            (per_page, offset)
+        ) as cursor:
+            rows = await cursor.fetchall()
+            columns = [description[0] for description in cursor.description]
+            subscriptions = [dict(zip(columns, row)) for row in rows]
+
+        return {
+            "subscriptions": subscriptions,
+            "total_subscriptions": total_subscriptions,
+            "current_page": page,
+            "total_pages": total_pages,
+            "per_page": per_page
+        }
+
     async def create_tables(self):
         """Create necessary tables if they don't exist."""
         if not self.db:
@@ -442,6 +732,7 @@ class Database:
                 (1 if is_active else 0, expires_at, user_id)
             )
             await db.commit()
+        self._invalidate_user(user_id)
 
     async def check_subscription(self, user_id: int) -> bool:
         """Check if user has active subscription."""
@@ -475,20 +766,16 @@ class Database:
         if not self.db:
             raise RuntimeError("Database not initialized")
         
-        try:
-            await self.db.execute(
-                """
-                UPDATE users 
-                SET check_interval = ?
-                WHERE user_id = ?
-                """,
-                (interval_hours * 3600, user_id)  # Convert hours to seconds
-            )
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        await self.execute_write((
+            """
+            UPDATE users 
+            SET check_interval = ?
+            WHERE user_id = ?
+            """,
+            (interval_hours * 3600, user_id)  # Convert hours to seconds
+        ))
+        self._invalidate_user(user_id)
+        return True
 
     async def get_active_subscriptions(self) -> List[Dict]:
         """Get all active subscriptions."""
@@ -514,47 +801,75 @@ class Database:
                 for row in rows
             ]
 
+    async def get_active_subscriptions_with_users(self) -> List[Dict]:
+        """Get active paid subscriptions joined with their users' settings."""
+        async with self.db.execute(
+            """
+            SELECT u.user_id, s.end_date, u.check_interval
+            FROM subscriptions s
+            JOIN users u ON s.user_id = u.user_id
+            WHERE u.subscription_status = 'active'
+            AND s.end_date > CURRENT_TIMESTAMP
+            """
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [
+                {
+                    "user_id": row[0],
+                    "end_date": row[1],
+                    "check_interval": row[2]
+                }
+                for row in rows
+            ]
+
+    async def get_inactive_subscriptions(self) -> List[Dict]:
+        """Get expired subscriptions and subscriptions of inactive users."""
+        async with self.db.execute(INACTIVE_SUBSCRIPTIONS_QUERY) as cursor:
+            rows = await cursor.fetchall()
+            return [
+                {
+                    "user_id": row[0],
+                    "payment_id": row[1],
+                    "start_date": row[2],
+                    "end_date": row[3],
+                    "check_interval": row[4]
+                }
+                for row in rows
+            ]
+
     async def delete_user(self, user_id: int) -> bool:
         """Delete user and all associated data from the database."""
         if not self.db:
             raise RuntimeError("Database not initialized")
         
-        try:
-            # Delete user data from all tables
-            # Due to ON DELETE CASCADE in foreign keys, this will automatically
-            # delete related records in other tables
-            await self.db.execute(
-                "DELETE FROM users WHERE user_id = ?",
-                (user_id,)
-            )
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        # Delete user data from all tables
+        # Due to ON DELETE CASCADE in foreign keys, this will automatically
+        # delete related records in other tables
+        await self.execute_write((
+            "DELETE FROM users WHERE user_id = ?",
+            (user_id,)
+        ))
+        self._invalidate_user(user_id)
+        return True
 
     async def clear_api_keys(self, user_id: int) -> bool:
         """Clear user's API keys."""
         if not self.db:
             raise RuntimeError("Database not initialized")
         
-        try:
-            # Clear both API key and client_id
-            await self.db.execute(
-                """
-                UPDATE users 
-                SET ozon_api_key = NULL,
-                    ozon_client_id = NULL,
-                    wildberries_api_key = NULL
-                WHERE user_id = ?
-                """,
-                (user_id,)
-            )
-            await self.db.commit()
-            return True
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        # Clear both API key and client_id
+        await self.execute_write((
+            """
+            UPDATE users 
+            SET ozon_api_key = NULL,
+                ozon_client_id = NULL,
+                wildberries_api_key = NULL
+            WHERE user_id = ?
+            """,
+            (user_id,)
+        ))
+        self._invalidate_user(user_id)
+        return True
 
     async def update_reminder_info(self, user_id: int) -> None:
         """Update reminder information for user.
@@ -565,26 +880,22 @@ class Database:
         if not self.db:
             raise RuntimeError("Database not initialized")
         
-        try:
+        await self.execute_write(
             # Обновляем время последнего напоминания
-            await self.db.execute(
+            (
                 "UPDATE users SET last_reminder_sent = datetime('now') WHERE user_id = ?",
                 (user_id,)
-            )
-            
+            ),
             # Добавляем запись о напоминании
-            await self.db.execute(
+            (
                 """
                 INSERT INTO user_notifications (user_id, type, created_at) 
                 VALUES (?, 'reminder', datetime('now'))
                 """,
                 (user_id,)
             )
-            
-            await self.db.commit()
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        )
+        self._invalidate_user(user_id)
 
     async def disable_reminders(self, user_id: int) -> None:
         """Disable reminders for user by adding maximum number of notifications.
@@ -595,23 +906,18 @@ class Database:
         if not self.db:
             raise RuntimeError("Database not initialized")
             
-        try:
-            await self.db.execute(
-                """
-                INSERT INTO user_notifications (user_id, type, created_at)
-                SELECT ?, 'reminder', datetime('now')
-                FROM (SELECT 1 AS dummy) d
-                WHERE (
-                    SELECT COUNT(*) FROM user_notifications
-                    WHERE user_id = ? AND type = 'reminder'
-                ) < 4
-                """,
-                (user_id, user_id)
-            )
-            await self.db.commit()
-        except Exception as e:
-            await self.db.rollback()
-            raise
+        await self.execute_write((
+            """
+            INSERT INTO user_notifications (user_id, type, created_at)
+            SELECT ?, 'reminder', datetime('now')
+            FROM (SELECT 1 AS dummy) d
+            WHERE (
+                SELECT COUNT(*) FROM user_notifications
+                WHERE user_id = ? AND type = 'reminder'
+            ) < 4
+            """,
+            (user_id, user_id)
+        ))
 
 async def init_db(database_path: str) -> Database:
     """Initialize and return database instance."""
@@ -3,20 +3,38 @@ Logging configuration for the PriceGuard bot.
 File: src/core/logging.py
 """
 
+import atexit
 import logging
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
 from typing import Optional
 
+# Background listener that performs the actual log writes
+_listener: Optional[QueueListener] = None
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
 def setup_logging(log_dir: str = "logs", log_level: int = logging.INFO) -> None:
     """
     Setup application logging with both file and console handlers.
     
+    Records are put on an in-memory queue by the root logger and written to
+    the file and console handlers by a background QueueListener thread, so
+    logging calls never block the event loop on disk or stdout I/O.
+    
     Args:
         log_dir: Directory to store log files
         log_level: Logging level (default: INFO)
     """
+    global _listener
+
     # Create logs directory if it doesn't exist
     log_path = Path(log_dir)
     log_path.mkdir(parents=True, exist_ok=True)
@@ -60,7 +78,6 @@ def setup_logging(log_dir: str = "logs", log_level: int = logging.INFO) -> None:
     )
     all_logs_handler.setFormatter(formatter)
     all_logs_handler.setLevel(log_level)
-    root_logger.addHandler(all_logs_handler)
 
     # Create and setup file handler for errors
     error_logs_handler = RotatingFileHandler(
@@ -71,13 +88,25 @@ def setup_logging(log_dir: str = "logs", log_level: int = logging.INFO) -> None:
     )
     error_logs_handler.setFormatter(formatter)
     error_logs_handler.setLevel(logging.ERROR)
-    root_logger.addHandler(error_logs_handler)
 
     # Create and setup console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
-    root_logger.addHandler(console_handler)
+
+    # Route all records through a queue to the background listener
+    _stop_listener()
+    log_queue = SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue,
+        all_logs_handler,
+        error_logs_handler,
+        console_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_stop_listener)
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
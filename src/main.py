@@ -6,9 +6,11 @@ import asyncio
 import logging
 import os
 import signal
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
+import orjson
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import Message
 from dotenv import load_dotenv
@@ -22,7 +24,7 @@ from services.marketplaces.factory import MarketplaceFactory
 from services.reminder import ReminderService
 from bot.handlers import admin, user, payment, reminders
 from bot.middlewares import setup_middlewares
-from bot.routers import admin_router, user_router, payment_router
+from bot.middlewares.flood import FloodControlMiddleware
 from services.payments.trial_checker import start_trial_checker
 from services.payments.subscription_checker import start_subscription_checker
 
@@ -47,6 +49,10 @@ async def shutdown(signal_type=None):
         logger.info("Stopping promotion monitor...")
         await monitor.stop()
     
+    # Close marketplace HTTP session
+    if dp and "marketplace_factory" in dp.workflow_data:
+        await dp["marketplace_factory"].close()
+    
     # Close bot session
     if bot:
         logger.info("Closing bot session...")
@@ -59,6 +65,10 @@ async def shutdown(signal_type=None):
     
     logger.info("Shutdown complete.")
 
+def _orjson_dumps(obj: Any) -> str:
+    """Serialize Bot API request data with orjson (aiogram expects str)."""
+    return orjson.dumps(obj).decode()
+
 async def start_reminder_checker(reminder_service: ReminderService):
     """Start periodic reminder checks."""
     while True:
@@ -81,7 +91,11 @@ async def main():
 
         # Initialize bot and dispatcher
         logger.info("Initializing bot...")
-        bot = Bot(token=config.telegram.token)
+        # Bot API requests and responses are (de)serialized with orjson
+        session = AiohttpSession(json_loads=orjson.loads, json_dumps=_orjson_dumps)
+        # Requests rejected with 429 wait out retry_after and are repeated
+        session.middleware(FloodControlMiddleware())
+        bot = Bot(token=config.telegram.token, session=session)
         dp = Dispatcher(storage=MemoryStorage())
         
         # Inject dependencies
@@ -114,6 +128,7 @@ async def main():
 
         # Register routers
         dp.include_router(admin.router)
+        dp.include_router(admin.denied_router)
         dp.include_router(user.router)
         dp.include_router(payment.router)
         dp.include_router(reminders.router)
@@ -6,6 +6,7 @@ File: src/services/marketplaces/base.py
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 import aiohttp
+import orjson
 from core.logging import get_logger
 from .queue import QueueManager
 
@@ -14,24 +15,32 @@ logger = get_logger(__name__)
 class MarketplaceClient(ABC):
     """Base class for marketplace clients."""
     
-    def __init__(self, api_key: str, marketplace: str):
+    def __init__(
+        self,
+        api_key: str,
+        marketplace: str,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initialize marketplace client.
         
         Args:
             api_key: API key for marketplace
             marketplace: Marketplace name for queue selection
+            session: Shared HTTP session; a private one is opened if not given
         """
         self.api_key = api_key
+        self._shared_session = session
         self.session: Optional[aiohttp.ClientSession] = None
         self.queue = QueueManager.get_queue(marketplace)
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = self._shared_session or aiohttp.ClientSession()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        # A shared session is owned by whoever passed it in
+        if self.session and self.session is not self._shared_session:
             await self.session.close()
     
     @abstractmethod
@@ -106,7 +115,7 @@ class MarketplaceClient(ABC):
                     logger.error(f"Unexpected response type: {content_type}\nBody: {text}")
                     raise ValueError("Invalid API key or Client ID")
                 
-                response_data = await response.json()
+                response_data = await response.json(loads=orjson.loads)
                 logger.info("Response data received")
                 
                 if response.status == 401:
@@ -122,9 +131,8 @@ class MarketplaceClient(ABC):
                     logger.error(f"Server error: {response.status}")
                     raise ConnectionError(f"Marketplace API error: {response.status}")
                 elif response.status >= 400:
-                    error_data = await response.json()
-                    logger.error(f"API error response:\n{error_data}")
-                    raise ValueError(error_data.get("message", "Unknown error"))
+                    logger.error(f"API error response:\n{response_data}")
+                    raise ValueError(response_data.get("message", "Unknown error"))
                 elif response.status >= 200 and response.status < 300:
                     return response_data
                 else:
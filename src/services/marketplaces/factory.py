@@ -3,7 +3,9 @@ Marketplace client factory for the PriceGuard bot.
 File: src/services/marketplaces/factory.py
 """
 
+import asyncio
 from typing import Dict, Optional, Union
+import aiohttp
 from cryptography.fernet import Fernet
 from .ozon import OzonClient
 from .wildberries import WildberriesClient
@@ -20,6 +22,24 @@ class MarketplaceFactory:
             encryption_key: Key for encrypting/decrypting API keys
         """
         self.fernet = Fernet(encryption_key.encode())
+        # Pooled HTTP session shared by all clients, opened on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, opening it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, ttl_dns_cache=300, keepalive_timeout=75
+                )
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
         
     def encrypt_api_key(self, api_key: str) -> str:
         """
@@ -86,9 +106,11 @@ class MarketplaceFactory:
             if marketplace.lower() == 'ozon':
                 if not client_id:
                     raise ValueError("client_id is required for Ozon API")
-                client = OzonClient(api_key=api_key, client_id=client_id)
+                client = OzonClient(
+                    api_key=api_key, client_id=client_id, session=self._get_session()
+                )
             elif marketplace.lower() == 'wildberries':
-                client = WildberriesClient(api_key=api_key)
+                client = WildberriesClient(api_key=api_key, session=self._get_session())
             else:
                 raise ValueError(f"Unsupported marketplace: {marketplace}")
                 
@@ -122,3 +144,88 @@ class MarketplaceFactory:
             WildberriesClient: Wildberries client instance
         """
         return await self.create_client('wildberries', encrypted_key, is_encrypted=True)
+
+    async def validate_key(
+        self,
+        marketplace: str,
+        api_key: str,
+        client_id: Optional[str] = None
+    ) -> bool:
+        """
+        Validate a plain (not yet encrypted) API key over the shared session.
+        
+        Args:
+            marketplace: Marketplace name ('ozon' or 'wildberries')
+            api_key: API key as entered by the user
+            client_id: Ozon client ID (required for Ozon)
+            
+        Returns:
+            bool: True if API key is valid
+            
+        Raises:
+            ValueError: If API key is invalid or required parameters are missing
+        """
+        client = await self.create_client(marketplace, api_key, client_id=client_id)
+        async with client:
+            return await client.validate_api_key()
+
+    async def validate_ozon(self, encrypted_key: Optional[str], client_id: Optional[str]) -> bool:
+        """
+        Check stored Ozon credentials against the API.
+        
+        Args:
+            encrypted_key: Encrypted API key
+            client_id: Ozon client ID
+            
+        Returns:
+            bool: True if the credentials are present and valid
+        """
+        if not encrypted_key or not client_id:
+            return False
+        try:
+            client = await self.get_ozon_client(encrypted_key, client_id)
+            async with client:
+                return await client.validate_api_key()
+        except Exception as e:
+            logger.error(f"Ozon API key validation failed: {str(e)}")
+            return False
+
+    async def validate_wildberries(self, encrypted_key: Optional[str]) -> bool:
+        """
+        Check stored Wildberries API key against the API.
+        
+        Args:
+            encrypted_key: Encrypted API key
+            
+        Returns:
+            bool: True if the key is present and valid
+        """
+        if not encrypted_key:
+            return False
+        try:
+            client = await self.get_wildberries_client(encrypted_key)
+            async with client:
+                return await client.validate_api_key()
+        except Exception as e:
+            logger.error(f"Wildberries API key validation failed: {str(e)}")
+            return False
+
+    async def validate_api_keys(self, user_data: Dict) -> Dict[str, bool]:
+        """
+        Validate user's stored API keys for both marketplaces.
+        
+        Both marketplaces are queried concurrently; a flow that needs to
+        validate several keys at once should gather the per-marketplace
+        checks the same way.
+        
+        Args:
+            user_data: User record with encrypted API keys
+            
+        Returns:
+            Dict[str, bool]: Validation result per marketplace
+        """
+        ozon_ok, wb_ok = await asyncio.gather(
+            self.validate_ozon(user_data.get('ozon_api_key'), user_data.get('ozon_client_id')),
+            self.validate_wildberries(user_data.get('wildberries_api_key'))
+        )
+        return {'ozon': ozon_ok, 'wildberries': wb_ok}
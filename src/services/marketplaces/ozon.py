@@ -4,20 +4,27 @@ Ozon marketplace integration service.
 
 from typing import List, Dict, Optional
 from datetime import datetime
+import aiohttp
 from .base import MarketplaceClient, logger
 
 class OzonClient(MarketplaceClient):
     """Client for Ozon API."""
     
-    def __init__(self, api_key: str, client_id: str):
+    def __init__(
+        self,
+        api_key: str,
+        client_id: str,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initialize Ozon client.
         
         Args:
             api_key: Ozon API key
             client_id: Ozon client ID
+            session: Shared HTTP session
         """
-        super().__init__(api_key, marketplace='ozon')
+        super().__init__(api_key, marketplace='ozon', session=session)
         self.client_id = client_id
         self.base_url = "https://api-seller.ozon.ru"
     
@@ -4,20 +4,22 @@ Wildberries marketplace integration service.
 
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+import aiohttp
 from .base import MarketplaceClient, logger
 from .queue import QueueManager
 
 class WildberriesClient(MarketplaceClient):
     """Client for Wildberries API."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize Wildberries client.
         
         Args:
             api_key: Wildberries API key
+            session: Shared HTTP session
         """
-        super().__init__(api_key, marketplace='wildberries')
+        super().__init__(api_key, marketplace='wildberries', session=session)
         self.base_url = "https://suppliers-api.wildberries.ru"
         self.calendar_url = "https://dp-calendar-api.wildberries.ru"
         self.common_url = "https://common-api.wildberries.ru"
@@ -4,6 +4,7 @@ Service for managing user reminders.
 
 import logging
 from datetime import datetime, timedelta
+from functools import cache
 from typing import Dict, List, Optional
 
 from aiogram import Bot
@@ -121,7 +122,9 @@ class ReminderService:
         except Exception as e:
             logger.error(f"Failed to send reminder to user {user_id}: {e}")
 
-    def _get_reminder_keyboard(self, action: str) -> InlineKeyboardMarkup:
+    @staticmethod
+    @cache
+    def _get_reminder_keyboard(action: str) -> InlineKeyboardMarkup:
         """Get keyboard for reminder message."""
         if action == 'add_api':
             keyboard = [
@@ -8,11 +8,18 @@ import os
 from typing import AsyncGenerator, Generator
 
 import pytest
+import pytest_asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.fsm.storage.memory import MemoryStorage
 from cryptography.fernet import Fernet
 
+# core.config loads settings on import
+os.environ.setdefault("BOT_TOKEN", "test_token")
+os.environ.setdefault("ADMIN_USER_ID", "123456789")
+os.environ.setdefault("PAYMENT_PROVIDER_TOKEN", "test_payment_token")
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+
 from core.config import Settings
 from core.database import Database, init_db
 from services.marketplaces.factory import MarketplaceFactory
@@ -57,13 +64,13 @@ async def marketplace_factory(settings: Settings) -> MarketplaceFactory:
     """Create test marketplace factory."""
     return MarketplaceFactory(settings.encryption_key)
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def database() -> AsyncGenerator[Database, None]:
     """Create test database."""
     db = Database(":memory:")
-    await db.connect()
+    await db.init()
     yield db
-    await db.disconnect()
+    await db.close()
 
 @pytest.fixture
 async def notification_service(bot: Bot) -> AsyncGenerator[NotificationService, None]:
@@ -2,6 +2,10 @@
 Tests for database operations.
 """
 
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
 import pytest
 from src.core.database import Database
 
@@ -81,3 +85,119 @@ async def test_promotion_operations(database: Database):
     await database.delete_promotion(123, "test_promo")
     promotions = await database.get_user_promotions(123)
     assert len(promotions) == 0
+
+@pytest.mark.asyncio
+async def test_execute_write_returns_rowcount(database: Database):
+    """Test that execute_write returns the rowcount of the last statement."""
+    await database.register_user(123, "test_user")
+
+    updated = await database.execute_write(
+        ("UPDATE users SET username = ? WHERE user_id = ?", ("new_name", 123))
+    )
+    assert updated == 1
+
+    updated = await database.execute_write(
+        ("UPDATE users SET username = ? WHERE user_id = ?", ("new_name", 456))
+    )
+    assert updated == 0
+
+@pytest.mark.asyncio
+async def test_execute_write_failure_is_isolated(database: Database):
+    """Test that a failed write in a batch does not roll back the others."""
+    insert = "INSERT INTO users (user_id, username) VALUES (?, ?)"
+    results = await asyncio.gather(
+        database.execute_write((insert, (1, "first"))),
+        # Both statements of a failed call are rolled back together
+        database.execute_write(
+            (insert, (2, "second")),
+            ("INSERT INTO missing_table VALUES (?)", (1,))
+        ),
+        database.execute_write((insert, (3, "third"))),
+        return_exceptions=True
+    )
+
+    assert results[0] == 1
+    assert isinstance(results[1], Exception)
+    assert results[2] == 1
+    assert (await database.get_user(1))["username"] == "first"
+    assert await database.get_user(2) is None
+    assert (await database.get_user(3))["username"] == "third"
+
+@pytest.mark.asyncio
+async def test_register_user(database: Database):
+    """Test that register_user only adds a user once."""
+    assert await database.register_user(123, "test_user", "Test User") is True
+    assert await database.register_user(123, "test_user", "Test User") is False
+
+    user = await database.get_user(123)
+    assert user["username"] == "test_user"
+    assert user["subscription_status"] == "trial"
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidated_on_write(database: Database):
+    """Test that get_user does not return a cached row after a write."""
+    await database.register_user(123, "test_user")
+    user = await database.get_user(123)
+    assert user["check_interval"] == 14400
+
+    await database.update_check_interval(123, 1)
+    user = await database.get_user(123)
+    assert user["check_interval"] == 3600
+
+    await database.update_ozon_credentials(123, "encrypted_key", "12345")
+    user = await database.get_user(123)
+    assert user["ozon_api_key"] == "encrypted_key"
+    assert user["ozon_client_id"] == "12345"
+
+@pytest.mark.asyncio
+async def test_cancel_subscription(database: Database):
+    """Test that cancel_subscription deactivates the subscription and the user."""
+    await database.register_user(123, "test_user")
+    now = datetime.now()
+    await database.activate_subscription(
+        {
+            "id": "test_payment",
+            "user_id": 123,
+            "amount": 299,
+            "status": "succeeded",
+            "months": 1,
+            "created_at": now
+        },
+        {
+            "user_id": 123,
+            "payment_id": "test_payment",
+            "start_date": now,
+            "end_date": now + timedelta(days=30),
+            "is_active": True
+        }
+    )
+    assert (await database.get_user(123))["subscription_status"] == "active"
+    assert (await database.get_subscription(123))["is_active"]
+
+    await database.cancel_subscription(123)
+
+    assert (await database.get_user(123))["subscription_status"] == "inactive"
+    rows = await database.fetch_all(
+        "SELECT is_active FROM subscriptions WHERE user_id = ?", (123,)
+    )
+    assert [row["is_active"] for row in rows] == [0]
+
+@pytest.mark.asyncio
+async def test_writer_survives_failed_rollback(database: Database, monkeypatch):
+    """Test that the writer keeps running when a batch cannot be rolled back."""
+    await database.register_user(123, "test_user")
+    commit, rollback = database.db.commit, database.db.rollback
+
+    async def failing(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(database.db, "commit", failing)
+    monkeypatch.setattr(database.db, "rollback", failing)
+    with pytest.raises(sqlite3.OperationalError):
+        await database.update_check_interval(123, 1)
+
+    monkeypatch.setattr(database.db, "commit", commit)
+    monkeypatch.setattr(database.db, "rollback", rollback)
+    await rollback()
+    assert await database.update_check_interval(123, 2) is True
+    assert (await database.get_user(123))["check_interval"] == 7200
@@ -0,0 +1,118 @@
+"""
+Tests for bot middlewares.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+from src.bot.middlewares.auth import AuthMiddleware
+from src.bot.middlewares.flood import FloodControlMiddleware
+from src.bot.middlewares.throttle import ThrottleMiddleware
+from src.bot.utils.messages import NOT_REGISTERED_MESSAGE
+
+def _callback(user_id: int, data: str) -> MagicMock:
+    """Create a callback query stub."""
+    callback = MagicMock()
+    callback.from_user.id = user_id
+    callback.data = data
+    callback.answer = AsyncMock()
+    return callback
+
+async def _noop_handler(event, **kwargs) -> None:
+    """Handler the middleware data points at."""
+
+def _message(user_id: int) -> MagicMock:
+    """Create a message stub."""
+    message = MagicMock()
+    message.from_user.id = user_id
+    message.from_user.last_name = None
+    message.answer = AsyncMock()
+    return message
+
+@pytest.mark.asyncio
+async def test_auth_asks_unknown_user_to_start():
+    """Test that handlers requiring registration are not reached by unknown users."""
+    db = MagicMock()
+    db.get_user = AsyncMock(return_value=None)
+    db.register_user = AsyncMock()
+    handler = AsyncMock()
+    message = _message(123)
+    data = {
+        "db": db,
+        "handler": HandlerObject(callback=_noop_handler, flags={"require_registered": True})
+    }
+
+    await AuthMiddleware(admin_id=1)(handler, message, data)
+
+    handler.assert_not_awaited()
+    db.register_user.assert_not_awaited()
+    message.answer.assert_awaited_once_with(NOT_REGISTERED_MESSAGE)
+
+@pytest.mark.asyncio
+async def test_auth_registers_unknown_user():
+    """Test that unknown users are registered for other handlers."""
+    db = MagicMock()
+    db.get_user = AsyncMock(side_effect=[None, {"subscription_status": "trial"}])
+    db.register_user = AsyncMock(return_value=True)
+    handler = AsyncMock()
+    data = {"db": db, "handler": HandlerObject(callback=_noop_handler)}
+
+    await AuthMiddleware(admin_id=1)(handler, _message(123), data)
+
+    db.register_user.assert_awaited_once()
+    handler.assert_awaited_once()
+    assert data["user_data"] == {"subscription_status": "trial"}
+
+@pytest.mark.asyncio
+async def test_throttle_drops_repeated_press():
+    """Test that a repeated press of the same button is dropped."""
+    middleware = ThrottleMiddleware(window=60)
+    handler = AsyncMock()
+    callback = _callback(123, "settings")
+
+    await middleware(handler, callback, {})
+    await middleware(handler, callback, {})
+
+    handler.assert_awaited_once()
+    callback.answer.assert_awaited_once_with()
+
+@pytest.mark.asyncio
+async def test_throttle_passes_other_buttons_and_users():
+    """Test that other buttons and other users are not throttled."""
+    middleware = ThrottleMiddleware(window=60)
+    handler = AsyncMock()
+
+    await middleware(handler, _callback(123, "settings"), {})
+    await middleware(handler, _callback(123, "help"), {})
+    await middleware(handler, _callback(456, "settings"), {})
+
+    assert handler.await_count == 3
+
+@pytest.mark.asyncio
+async def test_flood_control_retries_after_429():
+    """Test that a request rejected with 429 is repeated."""
+    method = SendMessage(chat_id=123, text="Test")
+    make_request = AsyncMock(side_effect=[
+        TelegramRetryAfter(method=method, message="Flood control", retry_after=0),
+        "response"
+    ])
+
+    result = await FloodControlMiddleware()(make_request, MagicMock(), method)
+
+    assert result == "response"
+    assert make_request.await_count == 2
+
+@pytest.mark.asyncio
+async def test_flood_control_gives_up_after_max_retries():
+    """Test that the 429 is raised once retries are exhausted."""
+    method = SendMessage(chat_id=123, text="Test")
+    make_request = AsyncMock(side_effect=TelegramRetryAfter(
+        method=method, message="Flood control", retry_after=0
+    ))
+
+    with pytest.raises(TelegramRetryAfter):
+        await FloodControlMiddleware(max_retries=2)(make_request, MagicMock(), method)
+
+    assert make_request.await_count == 3